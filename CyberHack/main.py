@@ -1,5 +1,7 @@
 import os
+import sys
 import time
+import argparse
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -9,11 +11,16 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.browser_pool import BrowserPool, CookieSession, chrome_factory
+
 # === CONFIG ===
 SAVE_DIR = "screenshots"
 os.makedirs(SAVE_DIR, exist_ok=True)
 
 DEFAULT_WAIT = 15
+TREND_TABS = ["trending", "for-you", "news", "sports", "entertainment"]
+COOKIE_FILE = "x_cookies.json"
 
 def create_chrome_driver(headless: bool | None = None):
     """Always open Chrome with your default profile directory."""
@@ -44,9 +51,9 @@ def _element_present(driver, by, selector) -> bool:
     except NoSuchElementException:
         return False
 
-def scrape_trending(driver):
-    """Navigate to trending tab and extract trending topics."""
-    url = "https://x.com/explore/tabs/trending"
+def scrape_trending(driver, tab: str = "trending"):
+    """Navigate to an explore tab (trending by default) and extract trending topics."""
+    url = f"https://x.com/explore/tabs/{tab}"
     driver.get(url)
 
     wait = WebDriverWait(driver, DEFAULT_WAIT)
@@ -80,22 +87,67 @@ def scrape_trending(driver):
         trending_list.append({"topic": topic_name, "tweets": tweet_count})
 
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    screenshot_path = os.path.join(SAVE_DIR, f"trending_{timestamp}.png")
+    screenshot_path = os.path.join(SAVE_DIR, f"{tab}_{timestamp}.png")
     driver.save_screenshot(screenshot_path)
     print(f"[INFO] Screenshot saved: {screenshot_path}")
     print(f"[INFO] Collected {len(trending_list)} trend items.")
     return trending_list
 
-if __name__ == "__main__":
+def print_trends(trends, title="Trending Topics"):
+    print(f"\n{title}:")
+    for i, t in enumerate(trends, 1):
+        print(f"{i}. {t['topic']} {'- ' + t['tweets'] if t['tweets'] else ''}")
+
+def save_session(cookie_file: str):
+    """Copy the X login from your Chrome profile into a cookie file the browser pool can reuse."""
     driver = create_chrome_driver()
     try:
-        trends = scrape_trending(driver)
-        print("\nTrending Topics:")
-        for i, t in enumerate(trends, 1):
-            print(f"{i}. {t['topic']} {'- ' + t['tweets'] if t['tweets'] else ''}")
+        driver.get("https://x.com/home")
+        CookieSession(cookie_file, "https://x.com/").save(driver)
+        print(f"[INFO] Session cookies saved: {cookie_file}")
     finally:
         driver.quit()
 
+def scrape_tabs_pooled(tabs, browsers: int, cookie_file: str, headless: bool = True):
+    """Capture several explore tabs at once on a pool of isolated browsers sharing one saved session."""
+    session = CookieSession(cookie_file, "https://x.com/")
+    if not session.exists():
+        print(f"[WARN] {cookie_file} not found; run with --save-session first. Browsers will not be logged in.")
+    pool = BrowserPool(chrome_factory(headless=headless), size=browsers,
+                       profile_root=os.path.join("browser_profiles", "x"),
+                       setup=lambda driver, index: session.restore(driver))
+    try:
+        futures = pool.map(scrape_trending, tabs)
+        for tab, fut in zip(tabs, futures):
+            try:
+                print_trends(fut.result(), f"Trending Topics ({tab})")
+            except Exception as e:
+                print(f"[ERROR] {tab}: {e}")
+    finally:
+        pool.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Capture X/Twitter trending topics (Chrome)")
+    parser.add_argument("--browsers", type=int, default=0,
+                        help="Headless browsers to run in parallel (default: one window on your Chrome profile)")
+    parser.add_argument("--tabs", nargs="+", default=None, metavar="TAB",
+                        help=f"Explore tabs to capture with --browsers (default: {' '.join(TREND_TABS)})")
+    parser.add_argument("--cookies", default=COOKIE_FILE, help="Saved session cookies used by --browsers")
+    parser.add_argument("--save-session", action="store_true", help="Save your Chrome profile's X cookies and exit")
+    parser.add_argument("--show", action="store_true", help="Show the pooled browsers instead of running headless")
+    args = parser.parse_args()
+
+    if args.save_session:
+        save_session(args.cookies)
+    elif args.browsers > 0:
+        scrape_tabs_pooled(args.tabs or TREND_TABS, args.browsers, args.cookies, headless=not args.show)
+    else:
+        driver = create_chrome_driver()
+        try:
+            print_trends(scrape_trending(driver))
+        finally:
+            driver.quit()
+
 # === Notes ===
 # - Close all Chrome windows before running, or you’ll hit “profile in use” errors.
 # - If you want to keep your normal Chrome open, create a separate Chrome profile (say Profile 5)
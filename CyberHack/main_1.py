@@ -1,7 +1,9 @@
 import os
+import sys
 import time
 import json
 import csv
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional, Iterable
 from selenium import webdriver
@@ -17,6 +19,9 @@ from selenium.common.exceptions import (
     StaleElementReferenceException,
 )
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.browser_pool import BrowserPool, CookieSession, firefox_factory
+
 # === CONFIG ===
 SAVE_DIR = "screenshots"
 SCROLL_ATTEMPTS = 5
@@ -146,15 +151,15 @@ def _parse_trend_block(block_text: str) -> Dict[str, str]:
             break
     return {"topic": topic or "Unknown", "tweets": tweets}
 
-def scrape_trending(driver: webdriver.Firefox) -> List[Dict[str, str]]:
-    """Scrape trending topics from Twitter/X Explore page.
+def scrape_trending(driver: webdriver.Firefox, tab: str = "trending") -> List[Dict[str, str]]:
+    """Scrape trending topics from a Twitter/X Explore tab (trending by default).
 
     Returns list of dicts: { 'topic': str, 'tweets': str }.
     """
     # Try both legacy twitter.com and new x.com domains
     trend_paths = [
-        "https://x.com/explore/tabs/trending",
-        "https://twitter.com/explore/tabs/trending",
+        f"https://x.com/explore/tabs/{tab}",
+        f"https://twitter.com/explore/tabs/{tab}",
     ]
     last_exc = None
     for url in trend_paths:
@@ -215,7 +220,7 @@ def scrape_trending(driver: webdriver.Firefox) -> List[Dict[str, str]]:
         except (StaleElementReferenceException, NoSuchElementException):
             trends.append({"topic": "Unknown", "tweets": ""})
 
-    screenshot_path = os.path.join(SAVE_DIR, "twitter_trending_full.png")
+    screenshot_path = os.path.join(SAVE_DIR, "twitter_trending_full.png" if tab == "trending" else f"twitter_{tab}_full.png")
     if driver.save_screenshot(screenshot_path):
         print(f"✅ Screenshot saved: {screenshot_path}")
     else:
@@ -352,6 +357,42 @@ def export_trends(
         print(f"💾 Exported: {p}")
     return created
 
+def scrape_tabs_pooled(tabs: List[str], browsers: int, cookie_file: str, headless: bool = True,
+                       base_name: str = "trending", formats: Iterable[str] = ("json", "csv"),
+                       timestamp: bool = True) -> Dict[str, List[Dict[str, str]]]:
+    """Scrape several Explore tabs on a pool of Firefox browsers that share one login.
+
+    The first browser without a saved session logs in with TWITTER_USERNAME /
+    TWITTER_PASSWORD and saves its cookies; the others (and later runs) reuse them.
+    """
+    session = CookieSession(cookie_file, "https://x.com/")
+    login_lock = threading.Lock()
+
+    def setup(driver, index):
+        with login_lock:
+            if session.restore(driver) and "login" not in driver.current_url.lower():
+                return
+            if TWITTER_USERNAME and TWITTER_PASSWORD and login_to_twitter(driver, TWITTER_USERNAME, TWITTER_PASSWORD):
+                session.save(driver)
+            else:
+                print(f"⚠️ Browser {index} is not logged in; trends may be unavailable.")
+
+    results: Dict[str, List[Dict[str, str]]] = {}
+    pool = BrowserPool(firefox_factory(headless=headless), size=browsers,
+                       profile_root=os.path.join("browser_profiles", "x-firefox"), setup=setup)
+    try:
+        for tab, fut in zip(tabs, pool.map(scrape_trending, tabs)):
+            try:
+                results[tab] = fut.result()
+            except Exception as e:
+                print(f"❌ {tab}: {e}")
+                results[tab] = []
+                continue
+            export_trends(results[tab], formats, base_name=f"{base_name}_{tab}", timestamp=timestamp)
+    finally:
+        pool.close()
+    return results
+
 if __name__ == "__main__":
     import argparse
 
@@ -366,8 +407,24 @@ if __name__ == "__main__":
     )
     parser.add_argument("--no-timestamp", action="store_true", help="Don't add timestamp suffix to export files")
     parser.add_argument("--base-name", type=str, default="trending", help="Base filename for exports")
+    parser.add_argument("--browsers", type=int, default=0,
+                        help="Scrape --tabs in parallel on this many isolated browsers (default: single browser)")
+    parser.add_argument("--tabs", type=str, default="trending,news,sports,entertainment",
+                        help="Comma-separated Explore tabs for --browsers")
+    parser.add_argument("--cookies", type=str, default="x_cookies.json", help="Session cookie file shared by --browsers")
     args = parser.parse_args()
 
+    if args.browsers > 0:
+        tabs = [t.strip() for t in args.tabs.split(',') if t.strip()]
+        export_formats = [f.strip().lower() for f in args.export_formats.split(',') if f.strip()]
+        for tab, trends in scrape_tabs_pooled(tabs, args.browsers, args.cookies, headless=args.headless,
+                                              base_name=args.base_name, formats=export_formats,
+                                              timestamp=not args.no_timestamp).items():
+            print(f"\n🔥 {tab} ({len(trends)} topics):")
+            for i, t in enumerate(trends, 1):
+                print(f"{i}. {t['topic']} - {t['tweets']}")
+        sys.exit(0)
+
     driver = None
     FIREFOX_PROFILE_PATH = args.profile
     try:
@@ -0,0 +1,299 @@
+"""Offline benchmark of the scan path.
+
+    python -m bench.run --posts 5000 --model stub --baseline bench/baseline.json
+
+Every stage runs against synthetic posts: keyword-only or stub-model
+classifiers (also inside ``--classifier-mode process`` workers), media
+served by a local HTTP stand-in, databases in a temporary directory.
+Results are per-stage throughput and p50/p95/p99 latency, plus the peak
+RSS of the whole run (this process and its worker processes); with
+``--baseline`` they are compared against a stored run and the exit code
+is 1 on a regression.
+"""
+import argparse
+import functools
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional
+
+from tabulate import tabulate
+
+from bench.synthetic import KeywordRegistry, StubImageModel, StubRegistry, generate_posts, media_server
+from classifiers.bullying import BullyingClassifier
+from classifiers.deepfake import DeepfakeClassifier
+from classifiers.fake_news import FakeNewsClassifier
+from classifiers.registry import ModelRegistry
+from engine.executor import ClassifierEngine
+from media.fetcher import MediaFetcher
+from storage.database import Database
+from storage.dedup import DedupIndex
+from storage.records import FlaggedRecord, RecordBatch
+from storage.reports import ReportGenerator
+
+
+STAGES = ('classify', 'dedup', 'insert_many', 'insert_flagged', 'report', 'scan')
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process or of its largest finished child (e.g. a classifier worker).
+
+    ru_maxrss only ever grows, so it is measured once per run, not per stage.
+    """
+    peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class StageTimer:
+    """Collects per-call latencies and the item count of one stage."""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self.items = 0
+        self.elapsed = 0.0
+
+    @contextmanager
+    def measure(self, items: int = 1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - start
+            self.samples.append(dt)
+            self.elapsed += dt
+            self.items += items
+
+    def wrap(self, fn, count=len):
+        """Time every call of ``fn``; ``count(first_arg)`` gives the items per call."""
+        def timed(*args, **kwargs):
+            with self.measure(count(args[0]) if args else 1):
+                return fn(*args, **kwargs)
+        return timed
+
+    def summary(self, wall: Optional[float] = None) -> Dict[str, float]:
+        seconds = wall if wall is not None else self.elapsed
+        ms = [s * 1000 for s in self.samples]
+        return {
+            'items': self.items,
+            'seconds': round(seconds, 4),
+            'throughput': round(self.items / seconds, 2) if seconds else 0.0,
+            'p50_ms': round(percentile(ms, 0.50), 3),
+            'p95_ms': round(percentile(ms, 0.95), 3),
+            'p99_ms': round(percentile(ms, 0.99), 3),
+        }
+
+
+def batches(items: List, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _registry_factory(args) -> Callable[[], ModelRegistry]:
+    # Picklable, so process-mode workers build the same stub or keyword-only registry.
+    if args.model == 'stub':
+        return functools.partial(StubRegistry, args.stub_latency_ms)
+    return KeywordRegistry
+
+
+def _deepfake(args, workdir: str) -> DeepfakeClassifier:
+    if args.model != 'stub' or not args.media_ratio:
+        return DeepfakeClassifier()
+    fetcher = MediaFetcher(os.path.join(workdir, 'media_cache'))
+    return DeepfakeClassifier(fetcher=fetcher, model=StubImageModel(args.stub_latency_ms / 2))
+
+
+def _flagged_records(posts, results) -> RecordBatch:
+    records = RecordBatch()
+    for post, flags in zip(posts, results):
+        for res in flags:
+            records.append(FlaggedRecord(post.platform, post.username, post.link, res['label'], res['confidence'],
+                                         '2024-01-01T00:00:00'))
+    return records
+
+
+def run_stages(args, posts: List, workdir: str) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    stages = set(args.stages)
+    factory = _registry_factory(args)
+    registry = factory()
+    text = (FakeNewsClassifier(registry=registry), BullyingClassifier(registry=registry))
+    deepfake = _deepfake(args, workdir)
+    engine = ClassifierEngine(text, deepfake, mode=args.classifier_mode, registry_factory=factory)
+    flags: List[List[Dict]] = []
+    db = Database(os.path.join(workdir, 'bench.db'))
+    try:
+        if stages & {'classify', 'insert_many', 'insert_flagged', 'report'}:
+            timer = StageTimer()
+            for chunk in batches(posts, args.batch_size):
+                with timer.measure(len(chunk)):
+                    flags.extend(engine.classify(chunk))
+            if 'classify' in stages:
+                results['classify'] = timer.summary()
+        if 'dedup' in stages:
+            timer = StageTimer()
+            dedup = DedupIndex(Database(os.path.join(workdir, 'dedup.db')))
+            for chunk in batches(posts, args.batch_size):
+                with timer.measure(len(chunk)):
+                    dedup.claim(chunk)
+            results['dedup'] = timer.summary()
+        records = _flagged_records(posts, flags)
+        if stages & {'insert_many', 'report'}:
+            timer = StageTimer()
+            for chunk in batches(list(records), 100):
+                with timer.measure(len(chunk)):
+                    db.insert_many(RecordBatch(chunk))
+            if 'insert_many' in stages:
+                results['insert_many'] = timer.summary()
+        if 'insert_flagged' in stages:
+            timer = StageTimer()
+            single = Database(os.path.join(workdir, 'single.db'))
+            for record in records:
+                with timer.measure():
+                    single.insert_flagged(record)
+            single.close()
+            results['insert_flagged'] = timer.summary()
+        if 'report' in stages:
+            timer = StageTimer()
+            reporter = ReportGenerator(db, reports_dir=os.path.join(workdir, 'reports'))
+            with timer.measure(db.count()):
+                reporter.generate()
+            results['report'] = timer.summary()
+    finally:
+        engine.close()
+        if deepfake.fetcher is not None:
+            deepfake.fetcher.close()
+        db.close()
+    if 'scan' in stages:
+        results['scan'] = run_scan(args, posts, workdir, registry, factory)
+    return results
+
+
+def run_scan(args, posts: List, workdir: str, registry: ModelRegistry,
+             registry_factory: Callable[[], ModelRegistry]) -> Dict[str, float]:
+    """End-to-end scrape -> classify -> persist through CyberShieldCLI, on its own fresh databases."""
+    from main import CyberShieldCLI  # imports the CLI's own dependencies only when needed
+
+    cwd = os.getcwd()
+    scan_dir = os.path.join(workdir, 'scan')
+    os.makedirs(scan_dir, exist_ok=True)
+    os.chdir(scan_dir)
+    try:
+        app = CyberShieldCLI(preload_models=False, cache_path=None, classifier_mode=args.classifier_mode)
+        for clf in (app.fake_news_classifier, app.bullying_classifier):
+            clf.registry = registry
+        app.engine.registry_factory = registry_factory  # read when the worker pool starts
+        deepfake = _deepfake(args, scan_dir)
+        app.deepfake_classifier.fetcher, app.deepfake_classifier.model = deepfake.fetcher, deepfake.model
+        # Per micro-batch latency of the classify stage; throughput over the whole scan.
+        timer = StageTimer()
+        app.classify_posts = timer.wrap(app.classify_posts)
+        start = time.perf_counter()
+        total, _ = app._run_scan('twitter', iter(posts))
+        wall = time.perf_counter() - start
+        app.evidence.close()
+        app.engine.close()
+        if deepfake.fetcher is not None:
+            deepfake.fetcher.close()
+        app.db.close()
+        summary = timer.summary(wall)
+        summary['items'] = total
+        summary['throughput'] = round(total / wall, 2) if wall else 0.0
+        return summary
+    finally:
+        os.chdir(cwd)
+
+
+def compare(run: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of ``run`` against ``baseline``: lower throughput or higher p95 per stage, higher peak RSS."""
+    problems = []
+    for stage, base in baseline.get('stages', {}).items():
+        cur = run['stages'].get(stage)
+        if cur is None:
+            continue
+        if base.get('throughput') and cur['throughput'] < base['throughput'] * (1 - tolerance):
+            problems.append(f"{stage}: throughput {cur['throughput']} < baseline {base['throughput']}")
+        if base.get('p95_ms') and cur['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            problems.append(f"{stage}: p95 {cur['p95_ms']} ms > baseline {base['p95_ms']} ms")
+    base_rss = baseline.get('peak_rss_mb')
+    if base_rss and run['peak_rss_mb'] > base_rss * (1 + tolerance):
+        problems.append(f"peak RSS {run['peak_rss_mb']} MB > baseline {base_rss} MB")
+    return problems
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline CyberShield scan benchmark.")
+    parser.add_argument('--posts', type=int, default=5000, help="Synthetic posts to generate")
+    parser.add_argument('--flag-rate', type=float, default=0.1, help="Fraction of posts containing a flagged keyword")
+    parser.add_argument('--dup-rate', type=float, default=0.05, help="Fraction of posts repeating an earlier post")
+    parser.add_argument('--media-ratio', type=float, default=0.2, help="Fraction of posts with an image")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--model', choices=['keywords', 'stub'], default='keywords',
+                        help="Keyword-only classifiers, or stub text/image models with fixed latency")
+    parser.add_argument('--stub-latency-ms', type=float, default=2.0, help="Stub model latency per item")
+    parser.add_argument('--media-latency-ms', type=float, default=5.0, help="Latency of the local media server")
+    parser.add_argument('--classifier-mode', choices=ClassifierEngine.MODES, default='inline')
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--output', help="Write the results JSON here")
+    parser.add_argument('--baseline', help="Baseline JSON to compare against (or to write with --save-baseline)")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative regression")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    needs_media = args.model == 'stub' and args.media_ratio > 0
+    with tempfile.TemporaryDirectory(prefix='cybershield-bench-') as workdir, \
+            (media_server(args.media_latency_ms) if needs_media else nullcontext(None)) as media_base:
+        posts = list(generate_posts(args.posts, args.flag_rate, args.dup_rate, args.media_ratio,
+                                    media_base or 'http://127.0.0.1:9', seed=args.seed))
+        stages = run_stages(args, posts, workdir)
+    run = {
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline', 'save_baseline')},
+        'stages': stages,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+    rows = [[name, s['items'], s['throughput'], s['p50_ms'], s['p95_ms'], s['p99_ms']] for name, s in stages.items()]
+    print(tabulate(rows, headers=['Stage', 'Items', 'Items/s', 'p50 ms', 'p95 ms', 'p99 ms'], tablefmt='grid'))
+    print(f"[+] Peak RSS: {run['peak_rss_mb']} MB")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"[+] Baseline saved: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('config', {}).get('posts') != args.posts:
+            print("[!] Baseline was recorded with a different --posts; comparison is approximate.", file=sys.stderr)
+        problems = compare(run, baseline, args.tolerance)
+        for p in problems:
+            print(f"[!] Regression: {p}", file=sys.stderr)
+        if problems:
+            return EXIT_REGRESSION
+        print("[+] No regressions against baseline.")
+    return EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
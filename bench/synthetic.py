@@ -0,0 +1,150 @@
+import random
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional, Sequence
+
+from classifiers.keywords import DEFAULT_KEYWORDS
+from classifiers.registry import ModelRegistry
+from media.images import ImageModel
+from storage.records import Post
+
+
+WORDS = ("india cricket monsoon festival market election river city train school music film farmers "
+         "startup budget weather temple harvest metro highway stadium diwali holi exam news update").split()
+
+
+def generate_posts(n: int, flag_rate: float = 0.1, dup_rate: float = 0.05, media_ratio: float = 0.2,
+                   media_base: Optional[str] = None, platform: str = 'twitter', seed: int = 0) -> Iterator[Post]:
+    """Deterministic synthetic posts.
+
+    ``flag_rate`` of the posts carry a flagged keyword, ``dup_rate`` repeat
+    an earlier post (same link and text) and ``media_ratio`` have an image
+    URL under ``media_base`` (the local stand-in server).
+    """
+    rng = random.Random(seed)
+    terms = [t for words in DEFAULT_KEYWORDS.values() for t in sorted(words)]
+    earlier: List[Post] = []
+    for i in range(n):
+        if earlier and rng.random() < dup_rate:
+            src = rng.choice(earlier)
+            yield Post(src.platform, src.username, src.content, src.link, src.media, src.post_id)
+            continue
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 40))]
+        if rng.random() < flag_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(terms))
+        user = f"user{rng.randrange(max(1, n // 10))}"
+        if platform == 'twitter':
+            link = f"https://twitter.com/{user}/status/{i + 1}"
+        else:
+            link = f"https://www.instagram.com/p/SYN{i + 1:08d}/"
+        media = [f"{media_base}/img/{rng.randrange(max(1, n // 4))}.png"] if media_base and rng.random() < media_ratio else []
+        post = Post(platform, user, ' '.join(words), link, media, str(i + 1))
+        if len(earlier) < 10000:
+            earlier.append(post)
+        yield post
+
+
+def png_bytes(seed: int, size: int = 32) -> bytes:
+    """A small deterministic RGB PNG, built with zlib only."""
+    rng = random.Random(seed)
+    raw = b''.join(b'\x00' + bytes(rng.randrange(256) for _ in range(size * 3)) for _ in range(size))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw, 1)) + chunk(b'IEND', b'')
+
+
+@contextmanager
+def media_server(latency_ms: float = 0.0):
+    """Local HTTP stand-in for the media CDN; yields its base URL (``/img/<n>.png``)."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            try:
+                seed = int(self.path.rsplit('/', 1)[-1].split('.')[0])
+            except ValueError:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            body = png_bytes(seed)
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='bench-media', daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class StubPipeline:
+    """Stands in for a transformers text-classification pipeline: fixed latency, deterministic labels."""
+
+    def __init__(self, latency_ms: float = 2.0, labels: Sequence[str] = ('POSITIVE', 'NEGATIVE')):
+        self.latency_ms = latency_ms
+        self.labels = labels
+
+    def __call__(self, texts, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        time.sleep(self.latency_ms * len(texts) / 1000)
+        out = []
+        for text in texts:
+            h = zlib.crc32(text.encode('utf-8'))
+            out.append({'label': self.labels[h % len(self.labels)], 'score': 0.5 + (h % 1000) / 2000})
+        return out
+
+
+class KeywordRegistry(ModelRegistry):
+    """Registry whose loads always fail, so classifiers use their keyword fallback."""
+
+    def get(self, task: str, model: str):
+        return None
+
+
+class StubRegistry(ModelRegistry):
+    """Registry that hands every classifier a StubPipeline instead of loading a model."""
+
+    def __init__(self, latency_ms: float = 2.0):
+        super().__init__()
+        self.latency_ms = latency_ms
+
+    def get(self, task: str, model: str):
+        key = (task, model)
+        with self._guard:
+            if key not in self._models:
+                labels = ('NON_HATE', 'HATE') if 'hate' in model.lower() else ('POSITIVE', 'NEGATIVE')
+                self._models[key] = StubPipeline(self.latency_ms, labels)
+            return self._models[key]
+
+
+class StubImageModel(ImageModel):
+    name = 'stub-image'
+    input_size = 32
+
+    def __init__(self, latency_ms: float = 1.0):
+        self.latency_ms = latency_ms
+
+    def predict(self, batch):
+        time.sleep(self.latency_ms * len(batch) / 1000)
+        return [float(img.mean()) for img in batch]
@@ -1,46 +1,29 @@
-from typing import Optional, Dict
-import random
+from typing import Dict, Tuple
 
-try:
-    from transformers import pipeline
-except Exception:  # pragma: no cover
-    pipeline = None
+from .text import TextClassifier
 
 
-class BullyingClassifier:
+class BullyingClassifier(TextClassifier):
     """Detects bullying / anti-India sentiment via model or keyword fallback."""
 
-    def __init__(self):
-        self._pipe = None
-        self.hate_keywords = {"hate","idiot","stupid","loser","terrorist","traitor","anti-india","anti india"}
+    label = 'bullying_or_hate'
+    version = '1'
+    task = 'text-classification'
+    model_name = 'Hate-speech-CNERG/dehatebert-mono-english'
+    model_min_length = 0
+    profile_name = 'classify_bullying'
 
-    def _load(self):
-        if pipeline and not self._pipe:
-            try:
-                self._pipe = pipeline('text-classification', model='Hate-speech-CNERG/dehatebert-mono-english')
-            except Exception:
-                self._pipe = None
+    @property
+    def hate_keywords(self):
+        return self.matcher.terms(self.label)
 
-    def classify(self, text: str) -> Optional[Dict]:
-        if not text:
-            return None
-        self._load()
-        flagged = False
-        score = 0.0
-        label = 'bullying_or_hate'
-        if self._pipe:
-            try:
-                res = self._pipe(text[:400])[0]
-                # Some models output labels like 'LABEL_0'; we simulate threshold
-                raw_label = res.get('label','').lower()
-                model_score = res.get('score',0.0)
-                if ('hate' in raw_label or 'toxic' in raw_label or 'offensive' in raw_label) and model_score > 0.6:
-                    flagged = True
-                    score = model_score
-            except Exception:
-                pass
-        if not flagged:
-            if any(k in text.lower() for k in self.hate_keywords):
-                flagged = True
-                score = 0.6 + random.random()*0.3
-        return {"label": label, "confidence": float(score), "flagged": flagged}
\ No newline at end of file
+    def _verdict(self, text: str, hit: bool, res: Dict) -> Tuple[bool, float]:
+        # Some models output labels like 'LABEL_0'; we simulate threshold
+        raw_label = res.get('label','').lower()
+        model_score = res.get('score',0.0)
+        hateful = ('hate' in raw_label and 'non' not in raw_label) or 'toxic' in raw_label or 'offensive' in raw_label
+        if hateful and model_score > 0.6:
+            return True, model_score
+        if not hateful and hit and self.cascade and self.cascade.is_final(self.label, model_score):
+            return False, 0.0  # confident benign verdict overrides keywords
+        return self._keyword_verdict(text, hit)
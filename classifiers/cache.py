@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+import hashlib
+import json
+import sqlite3
+import threading
+
+from engine.metrics import METRICS
+
+
+def normalize(text: str) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+def content_key(text: str, model_id: str, version: str, normalized: bool = True) -> str:
+    """Cache key of ``text``; pass ``normalized=False`` for case-sensitive content such as URLs."""
+    h = hashlib.sha256()
+    h.update(f"{model_id}\0{version}\0".encode())
+    h.update((normalize(text) if normalized else text).encode('utf-8'))
+    return h.hexdigest()
+
+
+def jitter(text: str, salt: str = '') -> float:
+    """Deterministic stand-in for ``random.random()`` derived from the normalized text.
+
+    Cached and freshly computed results must agree, so confidence jitter can
+    only depend on the content itself.
+    """
+    h = hashlib.sha256(f"{salt}\0{normalize(text)}".encode('utf-8')).digest()
+    return int.from_bytes(h[:8], 'big') / 2**64
+
+
+class ResultCache:
+    """Classifier result cache: in-memory LRU in front of an optional SQLite tier.
+
+    Keys combine the normalized-text hash with the model id and version, so
+    switching models (or keyword lists) never serves stale results.
+    """
+
+    def __init__(self, capacity: int = 10000, path: Optional[str] = None):
+        self.capacity = capacity
+        self.path = path
+        self._lru: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS classifier_cache (key TEXT PRIMARY KEY, result TEXT)")
+            self._conn.commit()
+
+    def _remember(self, key: str, result: Dict):
+        self._lru[key] = result
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Dict]:
+        found: Dict[str, Dict] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+                else:
+                    missing.append(key)
+            if missing and self._conn is not None:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, result FROM classifier_cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, raw in rows:
+                        found[key] = json.loads(raw)
+                        self._remember(key, found[key])
+                        self.disk_hits += 1
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        METRICS.inc('cache_hits_total', len(found))
+        METRICS.inc('cache_misses_total', len(keys) - len(found))
+        return {k: dict(v) for k, v in found.items()}
+
+    def put_many(self, items: Dict[str, Dict]):
+        if not items:
+            return
+        with self._lock:
+            for key, result in items.items():
+                self._remember(key, dict(result))
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO classifier_cache(key, result) VALUES (?,?)",
+                    [(k, json.dumps(v)) for k, v in items.items()],
+                )
+                self._conn.commit()
+
+    def lookup_batch(self, texts: Sequence[str], model_id: str, version: str,
+                     compute: Callable[[List[int]], List[Optional[Dict]]],
+                     normalized: bool = True) -> List[Optional[Dict]]:
+        """Serve cached results for ``texts`` and call ``compute(indices)`` for the misses."""
+        results: List[Optional[Dict]] = [None] * len(texts)
+        keys = {i: content_key(t, model_id, version, normalized) for i, t in enumerate(texts) if t}
+        cached = self.get_many(list(set(keys.values())))
+        pending: Dict[str, List[int]] = {}
+        for i, key in keys.items():
+            if key in cached:
+                results[i] = dict(cached[key])
+            else:
+                pending.setdefault(key, []).append(i)
+        if pending:
+            # Duplicates within the batch are computed once.
+            miss = [ids[0] for ids in pending.values()]
+            fresh = {}
+            for key, res in zip(pending, compute(miss)):
+                for i in pending[key]:
+                    results[i] = dict(res) if res is not None else None
+                if res is not None:
+                    fresh[key] = res
+            self.put_many(fresh)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses, 'size': len(self._lru)}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from typing import Dict, List, Sequence
+import threading
+
+
+def ascii_letter_ratio(text: str) -> float:
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return 0.0
+    return sum(1 for c in letters if c.isascii()) / len(letters)
+
+
+class Cascade:
+    """Early-exit cascade that decides which posts reach the transformer models.
+
+    The cheap stage (keyword hits, length and an English-script check) routes
+    most posts to a keyword-only verdict; only the remaining ambiguous posts
+    are batched through the model. With ``keyword_exit=False`` keyword hits
+    go to the model as well, and a benign verdict at or above
+    ``short_circuit`` on such a post is final: the keyword fallback is
+    skipped and counted as ``short_circuit``. Per-stage counts are kept for
+    each classifier label; posts answered from the result cache never reach
+    ``route`` and are counted as ``cached``.
+    """
+
+    STAGES = ('seen', 'cached', 'keyword_exit', 'too_short', 'non_english', 'no_keyword', 'to_model', 'short_circuit')
+
+    def __init__(self, min_length: int = 20, min_ascii_ratio: float = 0.6, keyword_exit: bool = True,
+                 require_keyword: bool = False, short_circuit: float = 0.95):
+        self.min_length = min_length
+        self.min_ascii_ratio = min_ascii_ratio
+        self.keyword_exit = keyword_exit
+        self.require_keyword = require_keyword
+        self.short_circuit = short_circuit
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.STAGES, 0))
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self) -> Dict:
+        """Constructor arguments, e.g. to rebuild the cascade in a worker process."""
+        return {'min_length': self.min_length, 'min_ascii_ratio': self.min_ascii_ratio,
+                'keyword_exit': self.keyword_exit, 'require_keyword': self.require_keyword,
+                'short_circuit': self.short_circuit}
+
+    @property
+    def fingerprint(self) -> str:
+        return (f"cascade({self.min_length},{self.min_ascii_ratio},{int(self.keyword_exit)},"
+                f"{int(self.require_keyword)},{self.short_circuit})")
+
+    def route(self, label: str, texts: Sequence[str], hits: Sequence[bool], model_min_length: int = 0) -> List[bool]:
+        """Return, per text, whether it needs the model."""
+        min_length = max(self.min_length, model_min_length)
+        counts = dict.fromkeys(self.STAGES, 0)
+        send = []
+        for text, hit in zip(texts, hits):
+            counts['seen'] += 1
+            if hit and self.keyword_exit:
+                stage = 'keyword_exit'  # keywords already flag it
+            elif len(text) < min_length:
+                stage = 'too_short'
+            elif ascii_letter_ratio(text) < self.min_ascii_ratio:
+                stage = 'non_english'  # the models are English-only
+            elif self.require_keyword and not hit:
+                stage = 'no_keyword'
+            else:
+                stage = 'to_model'
+            counts[stage] += 1
+            send.append(stage == 'to_model')
+        self._add(label, counts)
+        return send
+
+    def count_cached(self, label: str, n: int):
+        """Record ``n`` posts whose results came from the cache instead of ``route``."""
+        if n:
+            self._add(label, {'seen': n, 'cached': n})
+
+    def is_final(self, label: str, benign_score: float) -> bool:
+        """True if a benign model verdict on a keyword hit is confident enough to skip the keyword fallback."""
+        if benign_score >= self.short_circuit:
+            self._add(label, {'short_circuit': 1})
+            return True
+        return False
+
+    def _add(self, label: str, counts: Dict[str, int]):
+        with self._lock:
+            totals = self._counts[label]
+            for k, v in counts.items():
+                totals[k] += v
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Counts per stage and the fraction of posts passed through to the model, per label."""
+        with self._lock:
+            out = {}
+            for label, counts in self._counts.items():
+                row: Dict[str, float] = dict(counts)
+                row['model_rate'] = counts['to_model'] / counts['seen'] if counts['seen'] else 0.0
+                out[label] = row
+            return out
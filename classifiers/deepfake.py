@@ -1,26 +1,119 @@
 from typing import Optional, Dict, List
 import hashlib
-import random
+
+from engine.metrics import METRICS
+from engine.profiling import profiled
+from media.fetcher import MediaFetcher
+from media.images import ImageModel, load_batch
+from media.phash import HashIndex
+
+from .cache import ResultCache, jitter
 
 
 class DeepfakeClassifier:
-    """Mock deepfake detector using image URL/content hashing heuristics (demo)."""
+    """Deepfake detector: a batched image model over downloaded media, or URL hashing heuristics (demo).
+
+    With a ``fetcher`` and an image ``model`` the media of a whole batch of
+    posts is downloaded concurrently, decoded into one array and scored in
+    a single ``predict`` call. Posts whose images cannot be fetched or
+    decoded (or any post, without a model) fall back to the URL heuristic.
+    With a ``hash_index`` images that are near-duplicates of known deepfakes
+    are flagged from their perceptual hash alone, and new model detections
+    are added to the index.
+    """
+
+    label = 'deepfake'
+    version = '1'
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ResultCache] = None, fetcher: Optional[MediaFetcher] = None,
+                 model: Optional[ImageModel] = None, threshold: float = 0.5,
+                 hash_index: Optional[HashIndex] = None):
         self.suspect_hash_prefixes = {"00", "ff", "aa"}
+        self.cache = cache
+        self.fetcher = fetcher
+        self.model = model
+        self.threshold = threshold
+        self.hash_index = hash_index
+        self.model_error: Optional[str] = None  # last predict() failure; those posts keep the heuristic
+
+    @property
+    def model_id(self) -> str:
+        if self.model is not None and self.fetcher is not None:
+            return f"deepfake/{self.model.name}"
+        return 'deepfake/url-hash'
 
     def classify(self, media_urls: List[str]) -> Optional[Dict]:
-        if not media_urls:
-            return None
+        return self.classify_batch([media_urls])[0]
+
+    @profiled('classify_deepfake')
+    def classify_batch(self, media: List[List[str]]) -> List[Optional[Dict]]:
+        """Classify the media URL lists of many posts; None for posts without media."""
+        # Hash-index verdicts change as the index learns, so they are never served from the result cache.
+        if self.cache is None or self.hash_index is not None:
+            results = self._classify_batch(media)
+        else:
+            keys = ['\n'.join(urls) if urls else '' for urls in media]
+            # URLs are case-sensitive (and the heuristic hashes them raw), so keys are not normalized.
+            results = self.cache.lookup_batch(keys, self.model_id, self.version,
+                                              lambda idx: self._classify_batch([media[i] for i in idx]),
+                                              normalized=False)
+        # Posts the model failed on get the URL heuristic, outside the cache so a later run can retry them.
+        return [self._classify(urls) if res is None and urls else res for res, urls in zip(results, media)]
+
+    def _classify_batch(self, media: List[List[str]]) -> List[Optional[Dict]]:
+        results: List[Optional[Dict]] = [self._classify(urls) if urls else None for urls in media]
+        if self.fetcher is None or (self.model is None and self.hash_index is None):
+            return results
+        urls = list(dict.fromkeys(url for post_urls in media if post_urls for url in post_urls))
+        paths = self.fetcher.fetch_many(urls)
+        scores: Dict[str, float] = {}
+        hashes: Dict[str, int] = {}
+        if self.hash_index is not None:
+            for url in urls:
+                h = self.hash_index.hash_file(paths[url]) if paths[url] else None
+                if h is None:
+                    continue
+                hashes[url] = h
+                match = self.hash_index.nearest(h, label=self.label)
+                if match is not None:  # known deepfake (or a near copy of one): no model needed
+                    scores[url] = match.confidence
+        if self.model is not None:
+            todo = [url for url in urls if url not in scores]
+            batch, ok = load_batch([paths[url] for url in todo], self.model.input_size)
+            predictions = []
+            if batch is not None:
+                try:
+                    predictions = list(self.model.predict(batch))
+                except Exception as e:
+                    self.model_error = str(e) or e.__class__.__name__
+                    METRICS.inc('model_errors_total', classifier=self.label)
+                    failed = {todo[j] for j in ok}
+                    for n, post_urls in enumerate(media):
+                        if post_urls and any(url in failed for url in post_urls):
+                            results[n] = None  # classify_batch falls back to the heuristic
+            for j, score in zip(ok, predictions):
+                url = todo[j]
+                scores[url] = float(score)
+                if self.hash_index is not None and url in hashes and scores[url] >= self.threshold:
+                    self.hash_index.add(hashes[url], self.label, url, scores[url])
+        for n, post_urls in enumerate(media):
+            known = [scores[url] for url in post_urls or [] if url in scores]
+            if known:  # at least one image was scored; that verdict replaces the heuristic
+                confidence = max(known)
+                results[n] = {"label": "deepfake", "confidence": confidence, "flagged": confidence >= self.threshold}
+        return results
+
+    def _classify(self, media_urls: List[str]) -> Dict:
         flagged = False
         confidence = 0.0
         for url in media_urls:
             h = hashlib.sha256(url.encode()).hexdigest()
             if h[:2] in self.suspect_hash_prefixes:
                 flagged = True
-                confidence = max(confidence, 0.7 + random.random()*0.25)
-        # Random small probability of detection for demo diversity
-        if not flagged and random.random() < 0.05:
+                confidence = max(confidence, 0.7 + jitter(url, self.label)*0.25)
+        # Small (deterministic) probability of detection for demo diversity
+        key = '\n'.join(media_urls)
+        if not flagged and jitter(key, 'demo') < 0.05:
             flagged = True
-            confidence = 0.65 + random.random()*0.2
-        return {"label": "deepfake", "confidence": confidence, "flagged": flagged}
\ No newline at end of file
+            confidence = 0.65 + jitter(key, self.label)*0.2
+        return {"label": "deepfake", "confidence": confidence, "flagged": flagged}
@@ -1,51 +1,28 @@
-from typing import Optional, Dict
-import random
+from typing import Dict, Tuple
 
-try:
-    from transformers import pipeline
-except Exception:  # pragma: no cover
-    pipeline = None
+from .cache import jitter
+from .text import TextClassifier
 
 
-class FakeNewsClassifier:
+class FakeNewsClassifier(TextClassifier):
     """Lightweight fake news heuristic using sentiment as proxy with fallback keywords."""
 
-    def __init__(self):
-        self._pipe = None
-        self.keywords = {"hoax","fake","propaganda","fabricated","debunked"}
+    label = 'fake_news'
+    version = '1'
+    task = 'text-classification'
+    model_name = 'distilbert-base-uncased-finetuned-sst-2-english'
+    model_min_length = 81  # the model verdict only counts for longer texts
+    profile_name = 'classify_fake_news'
 
-    def _load(self):  # lazy
-        if pipeline and not self._pipe:
-            try:
-                self._pipe = pipeline('text-classification', model='distilbert-base-uncased-finetuned-sst-2-english')
-            except Exception:
-                self._pipe = None
+    @property
+    def keywords(self):
+        return self.matcher.terms(self.label)
 
-    def classify(self, text: str) -> Optional[Dict]:
-        if not text:
-            return None
-        self._load()
-        score = 0.0
-        label = 'fake_news'
-        flagged = False
-        if self._pipe:
-            try:
-                res = self._pipe(text[:400])[0]
-                # Interpret very negative sentiment on long text as potential fake news indicator (demo purpose)
-                if res['label'] == 'NEGATIVE' and res['score'] > 0.85 and len(text) > 80:
-                    score = res['score']
-                    flagged = True
-                else:
-                    # fallback heuristic using keywords
-                    if any(k in text.lower() for k in self.keywords):
-                        score = 0.75 + random.random()*0.2
-                        flagged = True
-            except Exception:
-                pass
-        if not self._pipe:  # keyword fallback only
-            if any(k in text.lower() for k in self.keywords):
-                score = 0.6 + random.random()*0.3
-                flagged = True
-        if flagged:
-            return {"label": label, "confidence": float(score), "flagged": True}
-        return {"label": label, "confidence": float(score), "flagged": False}
\ No newline at end of file
+    def _verdict(self, text: str, hit: bool, res: Dict) -> Tuple[bool, float]:
+        # Interpret very negative sentiment on long text as potential fake news indicator (demo purpose)
+        if res['label'] == 'NEGATIVE' and res['score'] > 0.85 and len(text) > 80:
+            return True, res['score']
+        if hit and not (self.cascade and res['label'] == 'POSITIVE' and self.cascade.is_final(self.label, res['score'])):
+            # fallback heuristic using keywords
+            return True, 0.75 + jitter(text, self.label)*0.2
+        return False, 0.0
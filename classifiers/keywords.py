@@ -0,0 +1,122 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+DEFAULT_KEYWORDS: Dict[str, Set[str]] = {
+    'fake_news': {"hoax","fake","propaganda","fabricated","debunked"},
+    'bullying_or_hate': {"hate","idiot","stupid","loser","terrorist","traitor","anti-india","anti india"},
+}
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over every classifier's keyword set.
+
+    One pass over the lowercased text finds all terms of all categories, so
+    classifiers can share a single scan per post instead of one substring
+    search per keyword. Keyword lists can be reloaded from a JSON file of
+    ``{"category": ["term", ...]}`` while the process is running.
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, Iterable[str]]] = None,
+                 path: Optional[str] = None, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._mtime = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._build(keywords if keywords is not None else DEFAULT_KEYWORDS)
+        if path:
+            self.load(path)
+
+    def _build(self, keywords: Dict[str, Iterable[str]]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[tuple]] = [[]]
+        terms: Dict[str, Set[str]] = {}
+        for category, words in keywords.items():
+            terms[category] = set()
+            for word in words:
+                word = word.strip().lower()
+                if not word:
+                    continue
+                terms[category].add(word)
+                node = 0
+                for ch in word:
+                    nxt = goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[node][ch] = nxt
+                        goto.append({})
+                        out.append([])
+                    node = nxt
+                out[node].append((category, word))
+        fail = [0] * len(goto)
+        q = deque(goto[0].values())
+        while q:
+            node = q.popleft()
+            for ch, nxt in goto[node].items():
+                q.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        # Swap in one assignment so concurrent match() calls see a consistent automaton.
+        self._automaton = (goto, fail, out, terms)
+        self.fingerprint = hashlib.sha1(
+            json.dumps({c: sorted(t) for c, t in terms.items()}, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+
+    def terms(self, category: str) -> Set[str]:
+        return set(self._automaton[3].get(category, ()))
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """Return ``{category: {matched terms}}`` for every category with a hit."""
+        goto, fail, out, _ = self._automaton
+        found: Dict[str, Set[str]] = {}
+        node = 0
+        for ch in (text or '').lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for category, word in out[node]:
+                found.setdefault(category, set()).add(word)
+        return found
+
+    def match_batch(self, texts: Iterable[str]) -> List[Dict[str, Set[str]]]:
+        self.reload_if_changed()
+        return [self.match(t) for t in texts]
+
+    def load(self, path: str):
+        """Rebuild the automaton from a JSON keyword file."""
+        with open(path, encoding='utf-8') as f:
+            keywords = json.load(f)
+        self._build(keywords)
+        self.path = path
+        self._mtime = os.path.getmtime(path)
+
+    def reload_if_changed(self) -> bool:
+        """Reload from ``path`` if the file changed; checks at most every ``check_interval`` seconds."""
+        if not self.path:
+            return False
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        with self._reload_lock:
+            self._last_check = now
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime == self._mtime:
+                    return False
+                self.load(self.path)
+            except (OSError, ValueError):
+                return False  # keep the current automaton
+        return True
+
+
+_keywords_path = os.environ.get('CYBERSHIELD_KEYWORDS')
+MATCHER = KeywordMatcher(path=_keywords_path if _keywords_path and os.path.exists(_keywords_path) else None)
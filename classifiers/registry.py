@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+
+try:
+    from transformers import pipeline
+except Exception:  # pragma: no cover
+    pipeline = None
+
+
+class ModelRegistry:
+    """Loads each transformers pipeline once, warms it up and remembers failures.
+
+    Classifiers share one registry, so a model is never loaded twice and a
+    failed load is not retried on every post (keyword-only mode stays cheap).
+    Pipelines are not thread-safe (fast tokenizers raise "Already borrowed"),
+    so callers run each one under its ``inference_lock``.
+    """
+
+    def __init__(self, warmup_text: str = "CyberShield warm-up"):
+        self.warmup_text = warmup_text
+        self._models: Dict[Tuple[str, str], object] = {}
+        self._failed: Dict[Tuple[str, str], str] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._inference: Dict[Tuple[str, str], threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def inference_lock(self, task: str, model: str) -> threading.Lock:
+        """Lock serializing calls into the (task, model) pipeline across classifier workers."""
+        with self._guard:
+            return self._inference.setdefault((task, model), threading.Lock())
+
+    def get(self, task: str, model: str):
+        """Return the loaded pipeline, or None if transformers is missing or the load failed."""
+        key = (task, model)
+        if key in self._models:
+            return self._models[key]
+        if pipeline is None or key in self._failed:
+            return None
+        # Concurrent callers (e.g. a background preload) wait for the same load.
+        with self._lock_for(key):
+            if key in self._models:
+                return self._models[key]
+            if key in self._failed:
+                return None
+            try:
+                pipe = pipeline(task, model=model)
+                pipe(self.warmup_text)
+            except Exception as e:
+                self._failed[key] = str(e) or e.__class__.__name__
+                return None
+            self._models[key] = pipe
+            return pipe
+
+    def failure(self, task: str, model: str) -> Optional[str]:
+        return self._failed.get((task, model))
+
+    def reset(self, task: Optional[str] = None, model: Optional[str] = None):
+        """Forget loaded models and recorded failures so the next get() loads again."""
+        with self._guard:
+            for store in (self._models, self._failed):
+                for key in list(store):
+                    if (task is None or key[0] == task) and (model is None or key[1] == model):
+                        del store[key]
+
+    def preload(self, specs: Iterable[Tuple[str, str]], background: bool = True) -> Optional[threading.Thread]:
+        """Load (task, model) pairs now, or in a daemon thread when ``background`` is set."""
+        specs = list(specs)
+
+        def _run():
+            for task, model in specs:
+                self.get(task, model)
+
+        if not background:
+            _run()
+            return None
+        t = threading.Thread(target=_run, name='model-preload', daemon=True)
+        t.start()
+        return t
+
+
+def run_pipeline(pipe, texts: Sequence[str], send: Sequence[bool], batch_size: int,
+                 lock: Optional[threading.Lock] = None) -> List[Optional[Dict]]:
+    """Batch the texts marked in ``send`` through ``pipe`` (holding ``lock``); None for the rest.
+
+    Pipeline errors propagate so the caller can record them.
+    """
+    outputs: List[Optional[Dict]] = [None] * len(texts)
+    todo = [j for j, s in enumerate(send) if s]
+    if not todo:
+        return outputs
+    batch = [texts[j][:400] for j in todo]
+    if lock is None:
+        results = pipe(batch, batch_size=batch_size, padding=True, truncation=True)
+    else:
+        with lock:
+            results = pipe(batch, batch_size=batch_size, padding=True, truncation=True)
+    for j, res in zip(todo, results):
+        outputs[j] = res
+    return outputs
+
+
+REGISTRY = ModelRegistry()
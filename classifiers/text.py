@@ -0,0 +1,114 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, List, Tuple
+
+from engine.metrics import METRICS
+from engine.profiling import PROFILER
+
+from .cache import ResultCache, jitter
+from .cascade import Cascade
+from .keywords import KeywordMatcher, MATCHER
+from .registry import ModelRegistry, REGISTRY, run_pipeline
+
+
+class TextClassifier(ABC):
+    """Keyword matching plus an optional transformers pipeline over batches of texts.
+
+    Loading, cascade routing, result caching and the keyword fallback are
+    shared; a subclass names its model and turns one pipeline output into a
+    verdict in ``_verdict``.
+    """
+
+    label = ''
+    version = '1'
+    task = 'text-classification'
+    model_name = ''
+    model_min_length = 0
+    profile_name = 'classify_text'
+
+    def __init__(self, batch_size: int = 16, registry: ModelRegistry = REGISTRY,
+                 matcher: KeywordMatcher = MATCHER, cache: Optional[ResultCache] = None,
+                 cascade: Optional[Cascade] = None):
+        self._pipe = None
+        self.registry = registry
+        self.batch_size = batch_size
+        self.matcher = matcher
+        self.cache = cache
+        self.cascade = cascade
+        self.model_error: Optional[str] = None  # last pipeline failure; those texts keep the keyword verdict
+
+    def _load(self):  # lazy; the registry loads once and caches failures
+        if not self._pipe:
+            self._pipe = self.registry.get(self.task, self.model_name)
+
+    @property
+    def model_id(self) -> str:
+        # Keyword-only results differ from model results and depend on the keyword list (and cascade routing).
+        model = f"{self.model_name}+{self.cascade.fingerprint}" if self._pipe and self.cascade else self.model_name
+        return f"{self.label}/{model if self._pipe else 'keywords'}:{self.matcher.fingerprint}"
+
+    def classify(self, text: str) -> Optional[Dict]:
+        return self.classify_batch([text])[0]
+
+    def classify_batch(self, texts: List[str], matches: Optional[List[Dict]] = None) -> List[Optional[Dict]]:
+        """Classify many texts with one batched pipeline call; output order matches input.
+
+        ``matches`` may carry precomputed ``KeywordMatcher.match_batch`` results
+        for ``texts`` so several classifiers share one keyword pass per post.
+        Results are served from ``cache`` when one is configured.
+        """
+        return PROFILER.call(self.profile_name, self._classify_texts, texts, matches)
+
+    def _classify_texts(self, texts: List[str], matches: Optional[List[Dict]]) -> List[Optional[Dict]]:
+        self._load()
+        if matches is None:
+            matches = self.matcher.match_batch(texts)
+        if self.cache is None:
+            results = self._classify_batch(texts, matches)
+        else:
+            computed = [0]
+
+            def compute(idx: List[int]) -> List[Optional[Dict]]:
+                computed[0] += len(idx)
+                return self._classify_batch([texts[i] for i in idx], [matches[i] for i in idx])
+
+            results = self.cache.lookup_batch(texts, self.model_id, self.version, compute)
+            if self._pipe and self.cascade:
+                self.cascade.count_cached(self.label, sum(1 for t in texts if t) - computed[0])
+        for i, text in enumerate(texts):
+            if text and results[i] is None:  # the pipeline failed: keyword verdict, never cached
+                results[i] = self._result(*self._keyword_verdict(text, self.label in matches[i]))
+        return results
+
+    def _result(self, flagged: bool, score: float) -> Dict:
+        return {"label": self.label, "confidence": float(score), "flagged": flagged}
+
+    def _keyword_verdict(self, text: str, hit: bool) -> Tuple[bool, float]:
+        return hit, (0.6 + jitter(text, self.label)*0.3 if hit else 0.0)
+
+    def _classify_batch(self, texts: List[str], matches: List[Dict]) -> List[Optional[Dict]]:
+        results: List[Optional[Dict]] = [None] * len(texts)
+        idx = [i for i, t in enumerate(texts) if t]
+        if not idx:
+            return results
+        batch = [texts[i] for i in idx]
+        hits = [self.label in matches[i] for i in idx]
+        outputs = [None] * len(batch)
+        if self._pipe:
+            send = (self.cascade.route(self.label, batch, hits, self.model_min_length) if self.cascade
+                    else [True] * len(batch))
+            try:
+                outputs = run_pipeline(self._pipe, batch, send, self.batch_size,
+                                       self.registry.inference_lock(self.task, self.model_name))
+            except Exception as e:
+                self.model_error = str(e) or e.__class__.__name__
+                METRICS.inc('model_errors_total', classifier=self.label)
+                return results  # classify_batch falls back to keywords
+        for i, text, hit, res in zip(idx, batch, hits, outputs):
+            # No model output (keyword-only mode, or a cascade exit): keyword verdict only.
+            verdict = self._keyword_verdict(text, hit) if res is None else self._verdict(text, hit, res)
+            results[i] = self._result(*verdict)
+        return results
+
+    @abstractmethod
+    def _verdict(self, text: str, hit: bool, res: Dict) -> Tuple[bool, float]:
+        """``(flagged, confidence)`` for one text from its pipeline output and keyword hit."""
@@ -0,0 +1,161 @@
+import os
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from classifiers.bullying import BullyingClassifier
+from classifiers.cascade import Cascade
+from classifiers.fake_news import FakeNewsClassifier
+from classifiers.keywords import KeywordMatcher, MATCHER
+from classifiers.registry import ModelRegistry, REGISTRY
+from .metrics import METRICS
+
+
+def _combine(posts: List[Dict], text_results: List[List[Optional[Dict]]],
+             media_results: List[Optional[Dict]]) -> List[List[Dict]]:
+    flagged = []
+    for n in range(len(posts)):
+        results = [res[n] for res in text_results if res[n] and res[n]['flagged']]
+        if media_results[n] and media_results[n]['flagged']:
+            results.append(media_results[n])
+        flagged.append(results)
+    return flagged
+
+
+def _classify_text(posts: List[Dict], text_classifiers: Sequence, matcher: KeywordMatcher) -> List[List[Optional[Dict]]]:
+    texts = [post.get('content', '') for post in posts]
+    # One shared keyword pass, then each text classifier over the whole batch at once
+    matches = matcher.match_batch(texts)
+    return [_timed_batch(clf, texts, matches) for clf in text_classifiers]
+
+
+def _timed_batch(clf, texts: List[str], matches: List[Dict]) -> List[Optional[Dict]]:
+    with METRICS.timer('stage_seconds', stage='classify', classifier=clf.label):
+        return clf.classify_batch(texts, matches)
+
+
+def _classify_media(posts: List[Dict], deepfake) -> List[Optional[Dict]]:
+    # Deepfake (if images present); the media of the whole batch is fetched together
+    with METRICS.timer('stage_seconds', stage='classify', classifier=deepfake.label):
+        return deepfake.classify_batch([list(post.get('media', ())) for post in posts])
+
+
+def run_classifiers(posts: List[Dict], text_classifiers: Sequence, deepfake, matcher: KeywordMatcher) -> List[List[Dict]]:
+    """Run every classifier over a batch of posts; returns the flagged results per post."""
+    return _combine(posts, _classify_text(posts, text_classifiers, matcher), _classify_media(posts, deepfake))
+
+
+# Per-process state for the process pool.
+_worker: Dict = {}
+
+
+def _init_worker(counter, torch_threads: int, cascade_settings: Optional[Dict] = None,
+                 registry_factory: Optional[Callable[[], ModelRegistry]] = None):
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    os.environ.setdefault('OMP_NUM_THREADS', str(torch_threads))
+    if hasattr(os, 'sched_setaffinity'):
+        # Pin each worker to its own slice of cores so torch threads don't contend.
+        cores = sorted(os.sched_getaffinity(0))
+        mine = cores[(index * torch_threads) % len(cores):][:torch_threads]
+        if mine:
+            try:
+                os.sched_setaffinity(0, mine)
+            except OSError:
+                pass
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except Exception:  # pragma: no cover
+        pass
+    cascade = Cascade(**cascade_settings) if cascade_settings is not None else None
+    registry = registry_factory() if registry_factory is not None else REGISTRY
+    text_classifiers = (FakeNewsClassifier(registry=registry, cascade=cascade),
+                        BullyingClassifier(registry=registry, cascade=cascade))
+    registry.preload([(clf.task, clf.model_name) for clf in text_classifiers], background=False)
+    _worker['text'] = text_classifiers
+
+
+def _classify_in_worker(posts: List[Dict]) -> List[List[Optional[Dict]]]:
+    return _classify_text(posts, _worker['text'], MATCHER)
+
+
+class ClassifierEngine:
+    """Executes the classifiers over post batches.
+
+    ``inline`` runs them one after another in the calling thread, ``thread``
+    runs each classifier concurrently on a thread pool, and ``process`` hands
+    chunks of posts to worker processes that each hold their own loaded
+    pipelines, with torch thread counts pinned to a slice of the cores.
+    Media is always classified in this process, overlapping the text work,
+    so image downloads never hold up a classifier worker. Per-classifier
+    timings of worker processes stay in those processes; the
+    ``classify_batch`` stage timer covers every mode. Worker processes load
+    models through the global REGISTRY unless ``registry_factory`` (a
+    picklable callable returning a ModelRegistry) is given.
+    """
+
+    MODES = ('inline', 'thread', 'process')
+
+    def __init__(self, text_classifiers: Sequence, deepfake, matcher: KeywordMatcher = MATCHER,
+                 mode: str = 'inline', workers: Optional[int] = None, torch_threads: int = 4,
+                 chunk_size: int = 16, registry_factory: Optional[Callable[[], ModelRegistry]] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown classifier mode: {mode}")
+        self.text_classifiers = list(text_classifiers)
+        self.deepfake = deepfake
+        self.matcher = matcher
+        self.mode = mode
+        self.torch_threads = max(1, torch_threads)
+        self.workers = workers or (max(1, (os.cpu_count() or 1) // self.torch_threads) if mode == 'process'
+                                   else len(self.text_classifiers) + 1)
+        self.chunk_size = max(1, chunk_size)
+        self.registry_factory = registry_factory
+        self._pool: Optional[Executor] = None
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            if self.mode == 'process':
+                ctx = multiprocessing.get_context('spawn')
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=ctx, initializer=_init_worker,
+                    initargs=(ctx.Value('i', 0), self.torch_threads, self._cascade_settings(), self.registry_factory),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _cascade_settings(self) -> Optional[Dict]:
+        for clf in self.text_classifiers:
+            if getattr(clf, 'cascade', None) is not None:
+                return clf.cascade.settings
+        return None
+
+    def classify(self, posts: List[Dict]) -> List[List[Dict]]:
+        if not posts:
+            return []
+        with METRICS.timer('stage_seconds', stage='classify_batch', mode=self.mode):
+            return self._classify(posts)
+
+    def _classify(self, posts: List[Dict]) -> List[List[Dict]]:
+        if self.mode == 'inline':
+            return run_classifiers(posts, self.text_classifiers, self.deepfake, self.matcher)
+        pool = self._executor()
+        if self.mode == 'process':
+            chunks = [posts[i:i + self.chunk_size] for i in range(0, len(posts), self.chunk_size)]
+            futures = [pool.submit(_classify_in_worker, chunk) for chunk in chunks]
+            media_results = _classify_media(posts, self.deepfake)
+            parts = [f.result() for f in futures]
+            text_results = [[r for part in parts for r in part[k]] for k in range(len(self.text_classifiers))]
+            return _combine(posts, text_results, media_results)
+        texts = [post.get('content', '') for post in posts]
+        matches = self.matcher.match_batch(texts)
+        text_futures = [pool.submit(_timed_batch, clf, texts, matches) for clf in self.text_classifiers]
+        media_future = pool.submit(_classify_media, posts, self.deepfake)
+        return _combine(posts, [f.result() for f in text_futures], media_future.result())
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
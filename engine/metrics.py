@@ -0,0 +1,234 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+# Upper bounds (seconds) of the timer histogram buckets; the last bucket is +Inf.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PREFIX = 'cybershield_'
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Timer:
+    __slots__ = ('count', 'sum', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+
+class Metrics:
+    """Process-wide counters, gauges and timers, keyed by name and labels.
+
+    Recording is a dict update under one lock, cheap enough to leave on in
+    every scan. Sinks (``PrometheusExporter``, ``JsonlSink``) and callers
+    read the values through ``snapshot``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Key, float] = {}
+        self._gauges: Dict[Key, float] = {}
+        self._timers: Dict[Key, _Timer] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        if not amount:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = self._timers[key] = _Timer()
+            timer.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Time the ``with`` block, e.g. ``with METRICS.timer('stage_seconds', stage='db_write'):``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator form of ``timer``."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def snapshot(self) -> Dict:
+        """Current values as plain data: ``{'time', 'counters', 'gauges', 'timers'}``."""
+        with self._lock:
+            counters = list(self._counters.items())
+            gauges = list(self._gauges.items())
+            timers = [(k, t.count, t.sum, t.max, list(t.buckets)) for k, t in self._timers.items()]
+        return {
+            'time': time.time(),
+            'counters': [{'name': n, 'labels': dict(l), 'value': v} for (n, l), v in counters],
+            'gauges': [{'name': n, 'labels': dict(l), 'value': v} for (n, l), v in gauges],
+            'timers': [{'name': n, 'labels': dict(l), 'count': c, 'sum': s, 'max': m, 'buckets': b}
+                       for (n, l), c, s, m, b in timers],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timers.clear()
+
+
+def _labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in items)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + '}'
+
+
+def render_prometheus(snapshot: Dict) -> str:
+    """Prometheus text exposition format; timers become histograms."""
+    lines: List[str] = []
+    typed = set()
+
+    def header(name: str, kind: str):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for entry in sorted(snapshot['counters'], key=lambda e: e['name']):
+        name = PREFIX + entry['name']
+        header(name, 'counter')
+        lines.append(f"{name}{_labels(entry['labels'])} {entry['value']}")
+    for entry in sorted(snapshot['gauges'], key=lambda e: e['name']):
+        name = PREFIX + entry['name']
+        header(name, 'gauge')
+        lines.append(f"{name}{_labels(entry['labels'])} {entry['value']}")
+    for entry in sorted(snapshot['timers'], key=lambda e: e['name']):
+        name = PREFIX + entry['name']
+        header(name, 'histogram')
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float('inf'),), entry['buckets']):
+            cumulative += n
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f"{name}_bucket{_labels(entry['labels'], ('le', le))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(entry['labels'])} {entry['sum']}")
+        lines.append(f"{name}_count{_labels(entry['labels'])} {entry['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+class PrometheusExporter:
+    """Serves ``/metrics`` in the Prometheus text format from a background thread."""
+
+    def __init__(self, metrics: Metrics, port: int = 9464, host: str = '127.0.0.1'):
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = render_prometheus(metrics.snapshot()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.address = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class JsonlSink:
+    """Appends a snapshot line to ``path`` every ``interval`` seconds and once more on close."""
+
+    def __init__(self, metrics: Metrics, path: str, interval: float = 10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='metrics-jsonl', daemon=True)
+        self._thread.start()
+
+    def write(self):
+        line = json.dumps(self.metrics.snapshot())
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError:
+                pass  # Non-critical
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+
+def open_sink(spec: str, metrics: Optional[Metrics] = None):
+    """Start a sink from ``prometheus[:[HOST:]PORT]`` or ``jsonl:PATH[:INTERVAL]``; it has a ``close()``."""
+    metrics = metrics or METRICS
+    kind, _, rest = spec.partition(':')
+    if kind == 'prometheus':
+        host, _, port = rest.rpartition(':')
+        return PrometheusExporter(metrics, int(port or 9464), host or '127.0.0.1')
+    if kind == 'jsonl':
+        if not rest:
+            raise ValueError("jsonl sink needs a path, e.g. jsonl:reports/metrics.jsonl")
+        path, sep, interval = rest.rpartition(':')
+        if sep and interval.replace('.', '', 1).isdigit():
+            return JsonlSink(metrics, path, float(interval))
+        return JsonlSink(metrics, rest)
+    raise ValueError(f"Unknown metrics sink: {spec}")
+
+
+METRICS = Metrics()
@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+from .metrics import METRICS
+from .profiling import PROFILER
+
+
+_DONE = object()
+
+
+class ScanPipeline:
+    """Scrape -> classify -> persist stages connected by bounded queues.
+
+    The scrape stage drains a post iterator in its own thread, classifier
+    workers pull micro-batches from a bounded queue and the persist stage
+    runs in the calling thread. Full queues block the upstream stage, so
+    memory stays proportional to ``queue_size`` rather than the scan size.
+    Per-post scrape time and the depth of both queues are recorded in
+    METRICS under ``name``.
+    """
+
+    def __init__(self, classify: Callable[[List[Dict]], List[List[Dict]]],
+                 persist: Callable[[Dict, List[Dict]], None],
+                 workers: int = 2, batch_size: int = 16, queue_size: int = 64, name: str = 'scan'):
+        self.classify = classify
+        self.persist = persist
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.queue_size = queue_size
+        self.name = name
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        # Blocking put that still notices a shutdown request.
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail(self, exc: BaseException):
+        self._errors.append(exc)
+        self._stop.set()
+
+    def _scrape(self, posts: Iterable[Dict], in_q: queue.Queue):
+        try:
+            it = iter(posts)
+            while True:
+                start = time.perf_counter()
+                try:
+                    post = next(it)
+                except StopIteration:
+                    break
+                METRICS.observe('stage_seconds', time.perf_counter() - start, stage='scrape', pipeline=self.name)
+                if not self._put(in_q, post):
+                    break
+                METRICS.set('queue_depth', in_q.qsize(), queue='classify', pipeline=self.name)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            for _ in range(self.workers):
+                self._put(in_q, _DONE)
+
+    def _next_batch(self, in_q: queue.Queue):
+        batch = []
+        done = False
+        while not self._stop.is_set() and len(batch) < self.batch_size:
+            try:
+                # Block for the first item only; then take whatever is ready.
+                item = in_q.get(timeout=0.1) if not batch else in_q.get_nowait()
+            except queue.Empty:
+                if batch:
+                    break
+                continue
+            if item is _DONE:
+                done = True
+                break
+            batch.append(item)
+        return batch, done or self._stop.is_set()
+
+    def _classify(self, in_q: queue.Queue, out_q: queue.Queue):
+        try:
+            done = False
+            while not done:
+                batch, done = self._next_batch(in_q)
+                if not batch:
+                    continue
+                for post, results in zip(batch, self.classify(batch)):
+                    if not self._put(out_q, (post, results)):
+                        return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(out_q, _DONE)
+
+    def run(self, posts: Iterable[Dict]) -> int:
+        """Run the scan to completion and return the number of posts processed."""
+        self._stop.clear()
+        self._errors = []
+        in_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        out_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # Stage threads are profiled under the caller's region (see Profiler.bind).
+        threads = [threading.Thread(target=PROFILER.bind(self._scrape), args=(posts, in_q), daemon=True)]
+        threads += [threading.Thread(target=PROFILER.bind(self._classify), args=(in_q, out_q), daemon=True)
+                    for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        processed = 0
+        finished = 0
+        try:
+            while finished < self.workers and not self._stop.is_set():
+                try:
+                    item = out_q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    finished += 1
+                    continue
+                post, results = item
+                METRICS.set('queue_depth', out_q.qsize(), queue='persist', pipeline=self.name)
+                self.persist(post, results)
+                processed += 1
+        except BaseException as e:
+            self._fail(e)
+            raise
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join(timeout=5)
+            for q, label in ((in_q, 'classify'), (out_q, 'persist')):
+                METRICS.set('queue_depth', q.qsize(), queue=label, pipeline=self.name)
+        if self._errors:
+            raise self._errors[0]
+        return processed
@@ -0,0 +1,190 @@
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+MODES = ('cprofile', 'sample')
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profiler:
+    """Optional profiling of named hot paths, off unless ``start`` is called.
+
+    ``cprofile`` runs a deterministic profiler around every call of a
+    ``@profiled`` function and writes one merged pstats file per name.
+    ``sample`` is the low-overhead option for production: a background
+    thread records the stacks of threads inside a profiled call every
+    ``interval`` seconds and writes them as collapsed stacks (flamegraph
+    input, one ``frame;frame;... count`` line per stack). Both only see
+    the thread that entered the region, so code that hands work to its own
+    threads starts them with ``bind`` to profile them under the same name.
+    Files go to ``out_dir`` when the run is closed.
+    """
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.out_dir = os.path.join('reports', 'profiles')
+        self.interval = 0.01
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._active: Dict[int, List[str]] = {}
+        self._samples: Counter = Counter()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._run_id = ''
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str, out_dir: Optional[str] = None, interval: Optional[float] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.close()
+        self.mode = mode
+        self.out_dir = out_dir or self.out_dir
+        self.interval = interval or self.interval
+        self.skipped = 0
+        # The pid keeps concurrent runs (e.g. replay shards) from overwriting each other.
+        self._run_id = f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        if mode == 'sample':
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+            self._sampler.start()
+
+    def current(self) -> Optional[str]:
+        """The outermost profiled region the calling thread is in, or None."""
+        if self.mode == 'sample':
+            with self._lock:
+                regions = self._active.get(threading.get_ident())
+            return regions[0] if regions else None
+        if self.mode == 'cprofile' and getattr(self._local, 'depth', 0):
+            return self._local.region
+        return None
+
+    def bind(self, fn):
+        """Wrap ``fn`` (a thread target) to run in the calling thread's current region, if any."""
+        name = self.current()
+        if name is None:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.call(name, fn, *args, **kwargs)
+        return wrapper
+
+    def call(self, name: str, fn, *args, **kwargs):
+        if self.mode == 'sample':
+            return self._call_sampled(name, fn, *args, **kwargs)
+        if self.mode == 'cprofile' and not getattr(self._local, 'depth', 0):
+            return self._call_cprofile(name, fn, *args, **kwargs)
+        return fn(*args, **kwargs)  # disabled, or nested inside an outer profiled call
+
+    def _call_cprofile(self, name: str, fn, *args, **kwargs):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is active (one per process on Python 3.12+)
+            with self._lock:
+                self.skipped += 1
+            return fn(*args, **kwargs)
+        self._local.depth = 1
+        self._local.region = name
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            self._local.depth = 0
+            profile.create_stats()
+            with self._lock:
+                if name in self._stats:
+                    self._stats[name].add(profile)
+                else:
+                    self._stats[name] = pstats.Stats(profile)
+
+    def _call_sampled(self, name: str, fn, *args, **kwargs):
+        ident = threading.get_ident()
+        with self._lock:
+            self._active.setdefault(ident, []).append(name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                regions = self._active[ident]
+                regions.pop()
+                if not regions:
+                    del self._active[ident]
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = {ident: regions[0] for ident, regions in self._active.items()}
+            if not active:
+                continue
+            frames = sys._current_frames()
+            stacks = []
+            for ident, region in active.items():
+                frame = frames.get(ident)
+                names = []
+                while frame is not None:
+                    if frame.f_code.co_filename != __file__:  # leave out the profiler's own wrappers
+                        names.append(_frame_name(frame))
+                    frame = frame.f_back
+                if names:
+                    stacks.append(region + ';' + ';'.join(reversed(names)))
+            del frames
+            with self._lock:
+                self._samples.update(stacks)
+
+    def close(self) -> List[str]:
+        """Stop profiling and write this run's files; returns their paths."""
+        if self.mode is None:
+            return []
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        os.makedirs(self.out_dir, exist_ok=True)
+        paths = []
+        with self._lock:
+            for name, stats in self._stats.items():
+                path = os.path.join(self.out_dir, f"{self._run_id}_{name}.pstats")
+                stats.dump_stats(path)
+                paths.append(path)
+            if self._samples:
+                path = os.path.join(self.out_dir, f"{self._run_id}.collapsed")
+                with open(path, 'w', encoding='utf-8') as f:
+                    for stack, count in self._samples.most_common():
+                        f.write(f"{stack} {count}\n")
+                paths.append(path)
+            self._stats = {}
+            self._samples = Counter()
+        self.mode = None
+        return paths
+
+
+PROFILER = Profiler()
+
+
+def profiled(name: str):
+    """Profile every call of the decorated function under ``name`` while PROFILER is started."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if PROFILER.mode is None:
+                return fn(*args, **kwargs)
+            return PROFILER.call(name, fn, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -1,35 +1,34 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-import time, os, sys, hashlib
+import time, os, sys, hashlib, threading
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from media.phash import HashIndex
+from storage.database import Database
+from scrapers.browser_pool import BrowserPool, CookieSession, chrome_factory, is_alive
 
 chrome_profile_path = r"C:\Users\Asus\AppData\Local\Google\Chrome\User Data"
 
-options = webdriver.ChromeOptions()
-
 automation_dir = os.environ.get(
     "CHROME_AUTOMATION_DIR",
     os.path.join(os.getcwd(), "chrome_automation_profile")
 )
 os.makedirs(automation_dir, exist_ok=True)
-options.add_argument(f"--user-data-dir={automation_dir}")
 profile_dir = os.environ.get("CHROME_PROFILE_DIR", "Default")
-options.add_argument(f"--profile-directory={profile_dir}")
-options.add_argument("--disable-blink-features=AutomationControlled")
+# Each browser gets its own profile under automation_dir; the login is shared through saved cookies.
+browsers = max(1, int(os.environ.get("REEL_BROWSERS", "1")))
+headless = os.environ.get("HEADLESS", "0").lower() in {"1","true","yes"}
+session = CookieSession(os.path.join(automation_dir, "instagram_cookies.json"), "https://www.instagram.com/")
+login_lock = threading.Lock()
+print_lock = threading.Lock()
 
-print("[INFO] Launching Chrome...")
-driver = webdriver.Chrome(options=options)
-try:
-    driver.maximize_window()
-except Exception:
-    pass
+def log(msg: str):
+    with print_lock:
+        print(msg)
 
-print("[STEP] Opening Instagram Reels page...")
-driver.get("https://www.instagram.com/reels/")
-WAIT = WebDriverWait(driver, 25)
+def wait(driver, timeout=25):
+    return WebDriverWait(driver, timeout)
 
 ENV_USER = "INSTA_USERNAME"
 ENV_PASS = "INSTA_PASSWORD"
@@ -40,7 +39,7 @@ def get_env(name: str) -> str:
         raise RuntimeError(f"Missing environment variable {name}")
     return v
 
-def dismiss_cookies():
+def dismiss_cookies(driver):
     texts = ["allow all", "accept all", "only allow essential", "accept", "allow"]
     for t in texts:
         try:
@@ -53,7 +52,7 @@ def dismiss_cookies():
         except WebDriverException:
             continue
 
-def on_login_page() -> bool:
+def on_login_page(driver) -> bool:
     url = driver.current_url.lower()
     if "accounts/login" in url: return True
     try:
@@ -63,13 +62,13 @@ def on_login_page() -> bool:
     except NoSuchElementException:
         return False
 
-def has_session_cookie() -> bool:
+def has_session_cookie(driver) -> bool:
     try:
         return any(c['name'] == 'sessionid' and c.get('value') for c in driver.get_cookies())
     except WebDriverException:
         return False
 
-def perform_login():
+def perform_login(driver):
     try:
         username = get_env(ENV_USER)
         password = get_env(ENV_PASS)
@@ -77,143 +76,272 @@ def perform_login():
         print(f"[WARN] {e}. Manual login required.")
         return False
     print("[STEP] Performing automatic Instagram login...")
-    if not on_login_page():
+    if not on_login_page(driver):
         driver.get("https://www.instagram.com/accounts/login/")
-        time.sleep(2)
-    dismiss_cookies()
+    dismiss_cookies(driver)
     try:
-        user_input = WAIT.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "input[name='username']")))
-        pass_input = WAIT.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "input[name='password']")))
+        user_input = wait(driver).until(EC.visibility_of_element_located((By.CSS_SELECTOR, "input[name='username']")))
+        pass_input = wait(driver).until(EC.visibility_of_element_located((By.CSS_SELECTOR, "input[name='password']")))
     except TimeoutException:
         print("[ERROR] Login inputs not found.")
         return False
     user_input.clear(); user_input.send_keys(username)
-    time.sleep(0.3)
     pass_input.clear(); pass_input.send_keys(password)
-    time.sleep(0.3)
     try:
         driver.find_element(By.XPATH, "//button[@type='submit' and not(@disabled)]").click()
     except NoSuchElementException:
         pass_input.send_keys("\n")
-    start = time.time()
-    while time.time() - start < 60:
-        if has_session_cookie() and not on_login_page():
-            print("[INFO] Login success.")
-            driver.get("https://www.instagram.com/reels/")
-            time.sleep(3)
-            return True
-        if any(k in driver.current_url.lower() for k in ["challenge","two_factor","verification"]):
-            print("[WARN] 2FA / challenge encountered.")
-            return False
-        time.sleep(2)
-    print("[WARN] Login not confirmed (timeout).")
-    return False
+    try:
+        outcome = WebDriverWait(driver, 60, poll_frequency=0.5).until(
+            lambda d: "ok" if has_session_cookie(driver) and not on_login_page(driver)
+            else "challenge" if any(k in d.current_url.lower() for k in ["challenge","two_factor","verification"])
+            else False
+        )
+    except TimeoutException:
+        print("[WARN] Login not confirmed (timeout).")
+        return False
+    if outcome == "challenge":
+        print("[WARN] 2FA / challenge encountered.")
+        return False
+    print("[INFO] Login success.")
+    open_reels(driver)
+    return True
+
+def open_reels(driver):
+    driver.get("https://www.instagram.com/reels/")
+    try:
+        wait(driver).until(lambda d: d.execute_script("return document.readyState") == "complete")
+    except TimeoutException:
+        pass
 
-def ensure_logged_in():
-    if "reels" in driver.current_url.lower() and has_session_cookie():
+def ensure_logged_in(driver):
+    if "reels" in driver.current_url.lower() and has_session_cookie(driver):
         return
-    if on_login_page():
-        dismiss_cookies()
-        ok = perform_login()
+    if on_login_page(driver):
+        dismiss_cookies(driver)
+        ok = perform_login(driver)
         if not ok:
             print("[INFO] Waiting up to 120s for manual login...")
-            start = time.time()
-            while time.time() - start < 120:
-                if has_session_cookie() and not on_login_page():
-                    driver.get("https://www.instagram.com/reels/")
-                    time.sleep(3)
-                    print("[INFO] Manual login detected.")
-                    return
-                time.sleep(3)
-            print("[ERROR] Manual login not completed.")
-            driver.quit(); sys.exit(1)
+            try:
+                WebDriverWait(driver, 120, poll_frequency=1).until(lambda d: has_session_cookie(driver) and not on_login_page(driver))
+            except TimeoutException:
+                print("[ERROR] Manual login not completed.")
+                raise RuntimeError("Instagram login not completed")
+            open_reels(driver)
+            print("[INFO] Manual login detected.")
     else:
-        driver.get("https://www.instagram.com/reels/")
-        time.sleep(3)
-        if on_login_page():
-            ensure_logged_in()
+        open_reels(driver)
+        if on_login_page(driver):
+            ensure_logged_in(driver)
 
-ensure_logged_in()
-
-if os.environ.get("CAPTURE", "1").lower() not in {"1","true","yes"}:
-    print("[INFO] CAPTURE disabled; leaving browser on Reels.")
-    sys.exit(0)
+def start_browser(driver, index):
+    """Pool setup: reuse the saved session, or log in once (serialized) and save it for the others."""
+    try:
+        driver.maximize_window()
+    except Exception:
+        pass
+    with login_lock:
+        log(f"[STEP] Browser {index}: opening Instagram Reels page...")
+        if session.restore(driver):
+            open_reels(driver)
+        else:
+            driver.get("https://www.instagram.com/reels/")
+        ensure_logged_in(driver)
+        if has_session_cookie(driver):
+            session.save(driver)
 
+capture_enabled = os.environ.get("CAPTURE", "1").lower() in {"1","true","yes"}
 target = int(os.environ.get("REEL_TARGET", "50"))
 out_dir = "reels_screenshots"
 os.makedirs(out_dir, exist_ok=True)
-print(f"[INFO] Saving up to {target} reel screenshots in {out_dir}")
 
+# Injected once per page: a MutationObserver queues every <video> that appears (or changes src)
+# and an IntersectionObserver marks the ones on screen, so Python only drains new nodes.
+OBSERVER_JS = """
+if (window.__csReels) return;
+const st = window.__csReels = {queue: [], seen: new WeakSet()};
+const io = new IntersectionObserver(entries => {
+    for (const e of entries) e.target.dataset.csVisible = e.intersectionRatio >= 0.5 ? '1' : '';
+}, {threshold: [0, 0.5]});
+const add = (v, again) => {
+    if (st.seen.has(v) && !again) return;
+    st.seen.add(v); st.queue.push(v); io.observe(v);
+};
+document.querySelectorAll('video').forEach(v => add(v));
+new MutationObserver(muts => {
+    for (const m of muts) {
+        if (m.type === 'attributes') { if (m.target.tagName === 'VIDEO') add(m.target, true); continue; }
+        for (const n of m.addedNodes) {
+            if (n.nodeType !== 1) continue;
+            if (n.tagName === 'VIDEO') add(n); else n.querySelectorAll('video').forEach(v => add(v));
+        }
+    }
+}).observe(document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ['src']});
+"""
+
+# Returns the queued reels as [element, identity source] pairs (null if the observer is gone).
+DRAIN_JS = """
+const st = window.__csReels;
+if (!st) return null;
+return st.queue.splice(0).filter(v => v.isConnected).map(v => {
+    const a = v.closest("a[href*='/reel/']");
+    return [v, (v.currentSrc || v.src || '').trim() || (a ? a.href : '')];
+});
+"""
+
+READY_JS = """
+const v = arguments[0];
+return v.isConnected && v.dataset.csVisible === '1' && v.readyState >= 2;
+"""
+
+# Shared by every browser in the pool.
+state_lock = threading.Lock()
 seen_ids = set()
+# Different src URLs can carry the same reel; screenshots are also compared by perceptual hash.
+shot_index = HashIndex(max_distance=4)
+known_media = HashIndex(Database(os.environ.get("CYBERSHIELD_DB", "cybershield.db")))
 saved = 0
-stagnant_scrolls = 0
 max_stagnant = 8
-last_new_time = time.time()
+batch_wait = 8  # seconds to wait for new reels after a scroll
 
-def reel_identity(video_el):
-    src = (video_el.get_attribute("src") or "").strip()
-    if not src:
-        # fall back to parent link
-        try:
-            link = video_el.find_element(By.XPATH, ".//ancestor::a[contains(@href,'/reel/')]")
-            src = link.get_attribute("href")
-        except Exception:
-            src = str(id(video_el))
-    return hashlib.sha1(src.encode("utf-8")).hexdigest()
+def drain_new_reels(d):
+    batch = d.execute_script(DRAIN_JS)
+    if batch is None:  # page navigated; re-inject
+        d.execute_script(OBSERVER_JS)
+        return False
+    return batch or False
+
+def reel_identity(video_el, src):
+    return hashlib.sha1((src or video_el.id).encode("utf-8")).hexdigest()
+
+def claim_reel(rid):
+    """Reserve a capture slot for an unseen reel; returns its index, or None if seen or the target is met."""
+    global saved
+    with state_lock:
+        if rid in seen_ids or saved >= target:
+            return None
+        seen_ids.add(rid)
+        saved += 1
+        return saved - 1
+
+def release_slot(rid=None):
+    """Give back a slot from claim_reel(); with ``rid`` the reel may also be claimed again."""
+    global saved
+    with state_lock:
+        saved -= 1
+        if rid is not None:
+            seen_ids.discard(rid)
 
-def center_and_capture(video_el, idx):
+def target_met():
+    with state_lock:
+        return saved >= target
+
+def center_and_capture(driver, video_el, rid, idx):
     driver.execute_script("""
         const el = arguments[0];
         el.scrollIntoView({behavior:'auto', block:'center', inline:'center'});
     """, video_el)
-    time.sleep(1.2)
-    rid = reel_identity(video_el)
+    # Wait for the observer to see it on screen with a decoded frame instead of sleeping.
+    try:
+        WebDriverWait(driver, 5, poll_frequency=0.05).until(lambda d: d.execute_script(READY_JS, video_el))
+    except TimeoutException:
+        pass  # capture whatever is rendered
     fname = os.path.join(out_dir, f"reel_{idx:03d}_{rid[:8]}.png")
     # Element-level screenshot (preferred). Fallback to full page if fails.
     try:
         video_el.screenshot(fname)
     except Exception:
         driver.save_screenshot(fname)
-    print(f"[CAPTURE] {fname}")
-
-print("[STEP] Starting scroll & capture loop...")
+    h = shot_index.hash_file(fname)
+    if h is not None:
+        with state_lock:
+            dup = shot_index.nearest(h)
+            if dup is None:
+                shot_index.add(h, "reel", fname)
+        if dup is not None:
+            os.remove(fname)
+            log(f"[SKIP] Near-duplicate of {dup.ref} (distance {dup.distance})")
+            return False
+        match = known_media.nearest(h)
+        if match is not None:
+            log(f"[MATCH] {fname} matches known {match.label} media {match.ref} (distance {match.distance})")
+    log(f"[CAPTURE] {fname}")
+    return True
 
-while saved < target:
-    # Collect candidate video elements
-    videos = driver.find_elements(By.XPATH, "//video")
-    new_in_cycle = 0
-    for v in videos:
+def capture_reels(driver):
+    """Pool job: capture unseen reels from this browser's feed until the shared target is met."""
+    driver.execute_script(OBSERVER_JS)
+    captured = 0
+    stagnant_waits = 0
+    last_new_time = time.time()
+    while not target_met():
+        # Block until the observer reports new reel nodes (polled cheaply in-page)
         try:
-            rid = reel_identity(v)
-            if rid in seen_ids:
-                continue
-            seen_ids.add(rid)
-            center_and_capture(v, saved)
-            saved += 1
-            new_in_cycle += 1
-            last_new_time = time.time()
-            if saved >= target:
-                break
-        except Exception as e:
-            print(f"[WARN] Capture error: {e}")
-    if saved >= target:
-        break
-    if new_in_cycle == 0:
-        stagnant_scrolls += 1
-    else:
-        stagnant_scrolls = 0
-    if stagnant_scrolls >= max_stagnant:
-        print("[INFO] No new reels after several scrolls; stopping.")
-        break
+            batch = WebDriverWait(driver, batch_wait, poll_frequency=0.1).until(drain_new_reels)
+        except TimeoutException:
+            batch = []
+        new_in_cycle = 0
+        for v, src in batch:
+            rid = idx = None
+            try:
+                rid = reel_identity(v, src)
+                idx = claim_reel(rid)
+                if idx is None:
+                    continue
+                if not center_and_capture(driver, v, rid, idx):
+                    release_slot()
+                    continue
+                idx = None  # the slot now holds a screenshot
+                captured += 1
+                new_in_cycle += 1
+                last_new_time = time.time()
+            except Exception as e:
+                if idx is not None:
+                    release_slot(rid)  # nothing was saved; another attempt (or browser) may capture it
+                if not is_alive(driver):
+                    raise  # let the pool restart this browser
+                log(f"[WARN] Capture error: {e}")
+        if target_met():
+            break
+        if new_in_cycle == 0:
+            stagnant_waits += 1
+        else:
+            stagnant_waits = 0
+        if stagnant_waits >= max_stagnant:
+            log("[INFO] No new reels after several scrolls; stopping.")
+            break
 
-    # Scroll down
-    driver.find_element(By.TAG_NAME, "body").send_keys(Keys.END)
-    time.sleep(2.2)
+        # Scroll down; the observer picks up whatever the feed loads next
+        driver.find_element(By.TAG_NAME, "body").send_keys(Keys.END)
 
-    # If feed stuck >60s without new reel break
-    if time.time() - last_new_time > 60:
-        print("[INFO] Stagnation timeout reached.")
-        break
+        # If feed stuck >60s without new reel break
+        if time.time() - last_new_time > 60:
+            log("[INFO] Stagnation timeout reached.")
+            break
+    return captured
 
+print(f"[INFO] Launching {browsers} Chrome browser(s)...")
+pool = BrowserPool(
+    chrome_factory(headless=headless, profile_directory=profile_dir),
+    size=browsers, profile_root=automation_dir, setup=start_browser,
+)
+
+if not capture_enabled:
+    if browsers == 1:
+        pool.submit(lambda driver: None).result()
+        print("[INFO] CAPTURE disabled; leaving browser on Reels.")
+        input("Press Enter to close the browser...")
+    pool.close()
+    sys.exit(0)
+
+print(f"[INFO] Saving up to {target} reel screenshots in {out_dir}")
+print("[STEP] Starting scroll & capture loop...")
+# One feed per browser; claim_reel() keeps them from capturing the same reel twice.
+futures = [pool.submit(capture_reels) for _ in range(browsers)]
+for fut in futures:
+    try:
+        fut.result()
+    except Exception as e:
+        print(f"[WARN] Browser worker failed: {e}")
+pool.close()
 print(f"[DONE] Captured {saved} reel(s). Quitting.")
-driver.quit()
\ No newline at end of file
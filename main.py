@@ -1,7 +1,13 @@
+import argparse
+import functools
+import json
 import sys
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from tabulate import tabulate
 
 from scrapers.twitter_scraper import TwitterScraper
@@ -9,8 +15,29 @@ from scrapers.instagram_scraper import InstagramScraper
 from classifiers.fake_news import FakeNewsClassifier
 from classifiers.deepfake import DeepfakeClassifier
 from classifiers.bullying import BullyingClassifier
+from classifiers.cache import ResultCache
+from classifiers.cascade import Cascade
+from classifiers.registry import REGISTRY
 from storage.database import Database
 from storage.reports import ReportGenerator
+from storage.dedup import DedupIndex, post_key
+from storage.evidence import EXTENSIONS, EvidenceRenderer
+from storage.records import FlaggedRecord, RecordBatch
+from storage.corpus import Corpus
+from engine.executor import ClassifierEngine
+from engine.metrics import METRICS, open_sink
+from engine.pipeline import ScanPipeline
+from engine.profiling import MODES as PROFILE_MODES, PROFILER, profiled
+from media.fetcher import MediaFetcher
+from media.images import load_image_model
+from media.phash import HashIndex
+
+
+DEFAULT_LIMITS = {'twitter': 30, 'instagram': 20}
+
+EXIT_OK = 0
+EXIT_SCAN_FAILED = 1
+EXIT_INTERRUPTED = 130
 
 
 def clear():
@@ -22,15 +49,63 @@ def pause():
 
 
 class CyberShieldCLI:
-    def __init__(self):
-        self.twitter_scraper = TwitterScraper()
-        self.instagram_scraper = InstagramScraper()
-        self.fake_news_classifier = FakeNewsClassifier()
-        self.deepfake_classifier = DeepfakeClassifier()
-        self.bullying_classifier = BullyingClassifier()
+    def __init__(self, preload_models: bool = True, cache_path: Optional[str] = 'classifier_cache.db',
+                 dedup: bool = True, incremental: bool = False, classifier_mode: str = 'inline',
+                 classifier_workers: Optional[int] = None, cascade: Optional[Cascade] = None,
+                 image_model: Optional[str] = None, media_index: bool = False,
+                 evidence_format: str = 'png', evidence_compression: Optional[int] = None):
         self.db = Database(db_path='cybershield.db')
+        # Incremental mode keeps a per-query cursor so repeat scans only fetch new posts.
+        cursors = self.db if incremental else None
+        self.twitter_scraper = TwitterScraper(cursors=cursors)
+        self.instagram_scraper = InstagramScraper(cursors=cursors)
+        self.result_cache = ResultCache(path=cache_path)
+        # Optional early-exit cascade: only ambiguous posts reach the transformer models.
+        self.cascade = cascade
+        self.fake_news_classifier = FakeNewsClassifier(cache=self.result_cache, cascade=cascade)
+        # Image model given as module:factory; without one the deepfake check uses URL heuristics.
+        spec = image_model or os.environ.get('CYBERSHIELD_IMAGE_MODEL')
+        try:
+            model = load_image_model(spec)
+        except Exception as e:
+            print(f"[!] Could not load image model {spec}: {e}. Using URL heuristics.", file=sys.stderr)
+            model = None
+        # Perceptual hashes of known deepfakes match re-posted media without running the model.
+        self.media_index = HashIndex(self.db) if media_index else None
+        if self.media_index is not None and model is None and not len(self.media_index):
+            print("[!] Media index is empty and no image model is set; seed it with python -m media.phash. "
+                  "Skipping media downloads.", file=sys.stderr)
+            self.media_index = None
+        self.media_fetcher = MediaFetcher() if model is not None or self.media_index is not None else None
+        self.deepfake_classifier = DeepfakeClassifier(cache=self.result_cache, fetcher=self.media_fetcher, model=model,
+                                                      hash_index=self.media_index)
+        self.bullying_classifier = BullyingClassifier(cache=self.result_cache, cascade=cascade)
         self.reporter = ReportGenerator(self.db)
-        self.flagged_session = []  # in-memory for current run
+        # The compression setting is the zlib level for PNG and the quality for WebP/JPEG.
+        key = 'compress_level' if evidence_format == 'png' else 'quality'
+        self.evidence = EvidenceRenderer(self.reporter.screens_dir, fmt=evidence_format,
+                                         **({key: evidence_compression} if evidence_compression is not None else {}))
+        self.dedup = DedupIndex(self.db) if dedup else None
+        self.engine = ClassifierEngine(
+            (self.fake_news_classifier, self.bullying_classifier), self.deepfake_classifier,
+            mode=classifier_mode, workers=classifier_workers,
+        )
+        self.flagged_session = RecordBatch()  # in-memory for current run
+        if preload_models and classifier_mode != 'process':  # worker processes load their own models
+            # Load and warm up models while the user is still in the menu.
+            REGISTRY.preload(
+                [(clf.task, clf.model_name) for clf in (self.fake_news_classifier, self.bullying_classifier)],
+                background=True,
+            )
+
+    def close(self):
+        """Stop the classifier workers and close evidence, media, cache and database handles."""
+        self.evidence.close()
+        self.engine.close()
+        if self.media_fetcher is not None:
+            self.media_fetcher.close()
+        self.result_cache.close()
+        self.db.close()
 
     def run(self):
         while True:
@@ -41,7 +116,8 @@ class CyberShieldCLI:
             print("1) Twitter Analysis")
             print("2) Instagram Analysis")
             print("3) Generate Report")
-            print("4) Exit")
+            print("4) Incremental Report")
+            print("5) Exit")
             choice = input("\nSelect option: ").strip()
             if choice == '1':
                 self.process_platform('twitter')
@@ -50,63 +126,165 @@ class CyberShieldCLI:
             elif choice == '3':
                 self.generate_report()
             elif choice == '4':
+                self.generate_incremental_report()
+            elif choice == '5':
                 print("Goodbye.")
                 break
             else:
                 print("Invalid selection. Try again.\n")
                 time.sleep(1.2)
 
+    def _scan_source(self, platform: str, query: str, limit: int):
+        scraper = self.twitter_scraper if platform == 'twitter' else self.instagram_scraper
+        posts = scraper.iter_fetch(query, limit=limit)
+        yielded = False
+        try:
+            for post in posts:
+                yielded = True
+                yield post
+        except Exception as e:
+            if yielded:
+                raise
+            print(f"[!] Error during scraping: {e}. Using backup dataset.", file=sys.stderr)
+            yield from scraper.iter_backup()
+
+    def classify_posts(self, posts: List[Dict], reserved: Optional[set] = None) -> List[List[Dict]]:
+        """Run every classifier over a batch of posts; returns the flagged results per post.
+
+        New posts are reserved in the dedup index and added to ``reserved``;
+        they only become seen when _run_scan persists them.
+        """
+        if self.dedup is None:
+            return self.engine.classify(posts)
+        # Posts seen in any earlier scan skip inference entirely.
+        flagged: List[List[Dict]] = [[] for _ in posts]
+        fresh = [n for n, is_new in enumerate(self.dedup.check(posts)) if is_new]
+        keys = [post_key(posts[n]) for n in fresh]
+        if reserved is not None:
+            reserved.update(keys)
+        METRICS.inc('dedup_skipped_total', len(posts) - len(fresh))
+        try:
+            results = self.engine.classify([posts[n] for n in fresh])
+        except BaseException:
+            self.dedup.release(keys)
+            raise
+        for n, res in zip(fresh, results):
+            flagged[n] = res
+        return flagged
+
+    def scan(self, platform: str, query: str, limit: Optional[int] = None,
+             on_record: Optional[Callable[[FlaggedRecord, Dict], None]] = None) -> Tuple[int, RecordBatch]:
+        """Scrape, classify and persist one query without any console interaction.
+
+        Returns the number of posts processed and the flagged records.
+        """
+        limit = limit or DEFAULT_LIMITS[platform]
+        return self._run_scan(platform, self._scan_source(platform, query, limit), on_record)
+
+    def scan_many(self, platform: str, queries: List[str], limit: Optional[int] = None,
+                  on_record: Optional[Callable[[FlaggedRecord, Dict], None]] = None,
+                  max_workers: Optional[int] = None, resume: bool = False,
+                  on_error: Optional[Callable[[str, BaseException], None]] = None) -> Tuple[int, RecordBatch]:
+        """Like scan(), but fetches all ``queries`` concurrently through the scraper's fetch_many().
+
+        Queries that fail are skipped and passed to ``on_error(query, exc)``.
+        """
+        scraper = self.twitter_scraper if platform == 'twitter' else self.instagram_scraper
+        source = scraper.fetch_many(queries, limit=limit or DEFAULT_LIMITS[platform], max_workers=max_workers,
+                                    resume=resume, on_error=on_error)
+        return self._run_scan(platform, source, on_record)
+
+    def replay(self, corpus_path: str, on_record: Optional[Callable[[FlaggedRecord, Dict], None]] = None,
+               shard: Tuple[int, int] = (0, 1)) -> Tuple[int, RecordBatch]:
+        """Classify and persist an archived corpus (see storage.corpus) instead of live scraping.
+
+        Replays bypass the dedup index: every archived post is classified on
+        each replay, and none of them is marked seen for later live scans.
+        """
+        with Corpus(corpus_path) as corpus, corpus.shard(*shard) as part:
+            return self._run_scan(None, part, on_record, dedup=False)
+
+    @profiled('scan')
+    def _run_scan(self, platform: Optional[str], source: Iterable[Dict],
+                  on_record: Optional[Callable[[FlaggedRecord, Dict], None]] = None,
+                  dedup: bool = True) -> Tuple[int, RecordBatch]:
+        dedup_index = self.dedup if dedup else None
+        records = RecordBatch()
+        pending = [RecordBatch()]  # flagged records written to the DB in batches
+        pending_keys: List[List[str]] = [[]]  # dedup keys of persisted posts, committed with those records
+        pending_posts: List[List[Dict]] = [[]]  # posts whose scrape cursors move once the batch is written
+        reserved: set = set()
+        scraper = {'twitter': self.twitter_scraper, 'instagram': self.instagram_scraper}.get(platform)
+        if scraper is not None and scraper.cursors is None:
+            scraper = None
+
+        def classify(posts):
+            if dedup_index is None:
+                return self.engine.classify(posts)
+            return self.classify_posts(posts, reserved)
+
+        def flush():
+            keys = pending_keys[0]
+            self.db.insert_many(pending[0], keys)
+            if dedup_index is not None:
+                dedup_index.mark_seen(keys)
+            if scraper is not None:
+                scraper.commit(pending_posts[0])
+            pending[0], pending_keys[0], pending_posts[0] = RecordBatch(), [], []
+
+        def persist(post, results):
+            METRICS.inc('posts_total', platform=platform or post.get('platform'))
+            for res in results:
+                record = FlaggedRecord(
+                    platform or post.get('platform'), post.get('username'), post.get('link'), res['label'], res['confidence'],
+                    datetime.utcnow().isoformat(timespec='seconds'),
+                )
+                METRICS.inc('flags_total', platform=record.platform, category=record.category)
+                pending[0].append(record)
+                records.append(record)
+                self.evidence.submit(record, post)
+                self.flagged_session.append(record)
+                if on_record:
+                    on_record(record, post)
+            if dedup_index is not None:
+                pending_keys[0].append(post_key(post))
+            if scraper is not None:
+                pending_posts[0].append(post)
+            if len(pending[0]) >= 100 or max(len(pending_keys[0]), len(pending_posts[0])) >= 500:
+                flush()
+
+        try:
+            total = ScanPipeline(classify, persist, name=platform or 'replay').run(source)
+        finally:
+            try:
+                flush()
+            finally:
+                if dedup_index is not None:
+                    # Posts classified but never persisted (crash, Ctrl-C) stay unseen.
+                    dedup_index.release(reserved)
+                self.evidence.flush()
+        return total, records
+
     def process_platform(self, platform: str):
         clear()
         print(f"[+] Starting {platform.title()} analysis...")
-        try:
-            if platform == 'twitter':
-                query = input("Enter Twitter search query (default: india): ").strip() or 'india'
-                posts = self.twitter_scraper.fetch(query=query, limit=30)
-            else:
-                hashtag = input("Enter Instagram hashtag without #: (default: india): ").strip() or 'india'
-                posts = self.instagram_scraper.fetch(hashtag=hashtag, limit=20)
-        except Exception as e:
-            print(f"[!] Error during scraping: {e}. Using backup dataset.")
-            posts = self.twitter_scraper.load_backup() if platform == 'twitter' else self.instagram_scraper.load_backup()
+        if platform == 'twitter':
+            query = input("Enter Twitter search query (default: india): ").strip() or 'india'
+        else:
+            query = input("Enter Instagram hashtag without #: (default: india): ").strip() or 'india'
 
-        if not posts:
+        # Profile the scan only, not the prompts around it.
+        total, records = PROFILER.call('process_platform', self.scan, platform, query)
+        if not total:
             print("No posts retrieved.")
             pause()
             return
 
-        flagged_rows = []
-        for post in posts:
-            text = post.get('content','')
-            # Run classifiers
-            results = []
-            for clf in (self.fake_news_classifier, self.bullying_classifier):
-                res = clf.classify(text)
-                if res and res['flagged']:
-                    results.append(res)
-            # Deepfake (if images present)
-            if post.get('media'):
-                dres = self.deepfake_classifier.classify(post['media'])
-                if dres and dres['flagged']:
-                    results.append(dres)
-            for res in results:
-                record = {
-                    'platform': platform,
-                    'username': post.get('username'),
-                    'link': post.get('link'),
-                    'category': res['label'],
-                    'confidence': res['confidence'],
-                    'timestamp': datetime.utcnow().isoformat(timespec='seconds')
-                }
-                self.db.insert_flagged(record)
-                self.reporter.save_screenshot_placeholder(record, post)
-                flagged_rows.append([
-                    record['platform'], record['username'], record['link'], record['category'], f"{record['confidence']:.2f}"
-                ])
-                self.flagged_session.append(record)
-
+        flagged_rows = [
+            [r['platform'], r['username'], r['link'], r['category'], f"{r['confidence']:.2f}"] for r in records
+        ]
         clear()
-        print(f"Scan complete. Retrieved {len(posts)} posts. Flagged {len(flagged_rows)}")
+        print(f"Scan complete. Retrieved {total} posts. Flagged {len(flagged_rows)}")
         if flagged_rows:
             print("\nFlagged Posts:")
             print(tabulate(flagged_rows, headers=["Platform","User","Link","Category","Conf"], tablefmt='grid'))
@@ -121,11 +299,197 @@ class CyberShieldCLI:
         print(f"Report generated:\n CSV: {csv_path}\n PDF: {pdf_path}")
         pause()
 
+    def generate_incremental_report(self):
+        clear()
+        print("Generating incremental report...")
+        csv_path, pdf_path = self.reporter.generate_incremental()
+        if pdf_path:
+            print(f"Report updated:\n CSV: {csv_path}\n Delta PDF: {pdf_path}")
+        else:
+            print("No new flagged records since the last incremental report.")
+        pause()
+
 
-if __name__ == '__main__':
+def run_batch(args) -> int:
+    """Headless scan of every query given on the command line; returns the exit code."""
+    app = CyberShieldCLI(preload_models=not args.no_preload, dedup=not args.no_dedup,
+                         incremental=args.incremental or args.resume, classifier_mode=args.classifier_mode,
+                         classifier_workers=args.classifier_workers,
+                         cascade=cascade_from_args(args),
+                         image_model=args.image_model, media_index=args.media_index,
+                         evidence_format=args.evidence_format, evidence_compression=args.evidence_compression)
     try:
+        return _run_batch(app, args)
+    finally:
+        app.close()
+
+
+def _run_batch(app: CyberShieldCLI, args) -> int:
+    jobs = [(platform, queries) for platform, queries in (('twitter', args.twitter), ('instagram', args.instagram)) if queries]
+    out_lock = threading.Lock()
+    failed = 0
+    failed_queries = []
+
+    def emit(record, post):
+        if args.jsonl:
+            with out_lock:
+                sys.stdout.write(json.dumps(dict(record, query=post.get('query'))) + "\n")
+                sys.stdout.flush()
+
+    def query_failed(platform, query, exc):
+        with out_lock:
+            failed_queries.append((platform, query))
+        print(f"[!] {platform} query {query!r} failed: {exc}", file=sys.stderr)
+
+    # One scan per platform (each scraper fans its queries out over its own worker pool) and per replay corpus.
+    with ThreadPoolExecutor(max_workers=len(jobs) + len(args.replay)) as pool:
+        futures = {pool.submit(app.scan_many, platform, queries, args.limit, emit, args.workers, args.resume,
+                               functools.partial(query_failed, platform)): platform
+                   for platform, queries in jobs}
+        futures.update({pool.submit(app.replay, path, emit, tuple(args.shard)): f"replay {path}" for path in args.replay})
+        for fut in as_completed(futures):
+            platform = futures[fut]
+            try:
+                total, records = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[!] {platform} scan failed: {e}", file=sys.stderr)
+                continue
+            print(f"[+] {platform}: {total} posts, {len(records)} flagged", file=sys.stderr)
+    if failed_queries:
+        failed += 1
+        print(f"[!] {len(failed_queries)} queries failed", file=sys.stderr)
+    if args.report == 'full':
+        print("Report: %s, %s" % app.reporter.generate(), file=sys.stderr)
+    elif args.report == 'incremental':
+        print("Report: %s, %s" % app.reporter.generate_incremental(), file=sys.stderr)
+    for clf in (app.fake_news_classifier, app.bullying_classifier):
+        if clf.model_error:
+            print(f"[!] {clf.label} model failed, keyword fallback used instead: {clf.model_error}", file=sys.stderr)
+    if app.deepfake_classifier.model_error:
+        print(f"[!] Image model failed, URL heuristics used instead: {app.deepfake_classifier.model_error}",
+              file=sys.stderr)
+    if app.cascade is not None and args.classifier_mode != 'process':  # workers keep their own counts
+        for label, row in app.cascade.stats().items():
+            print(f"[+] cascade {label}: {row['seen']} posts, {row['cached']} from cache, {row['to_model']} to model "
+                  f"({row['model_rate']:.0%}), {row['short_circuit']} short-circuited", file=sys.stderr)
+    return EXIT_SCAN_FAILED if failed else EXIT_OK
+
+
+def cascade_from_args(args) -> Optional[Cascade]:
+    if not args.cascade:
+        return None
+    if args.cascade_threshold is None:
+        return Cascade()
+    # Keyword hits are verified by the model, whose confident benign verdict short-circuits the keyword fallback.
+    return Cascade(keyword_exit=False, short_circuit=args.cascade_threshold)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="CyberShield scanner. Without arguments the interactive menu starts.")
+    sub = parser.add_subparsers(dest='command')
+    batch = sub.add_parser('batch', help="Run unattended scans (for cron/systemd).")
+    batch.add_argument('--twitter', nargs='+', default=[], metavar='QUERY', help="Twitter search queries")
+    batch.add_argument('--instagram', nargs='+', default=[], metavar='HASHTAG', help="Instagram hashtags without #")
+    batch.add_argument('--replay', nargs='+', default=[], metavar='CORPUS',
+                       help="Classify archived corpora (python -m storage.corpus converts CSVs) instead of scraping")
+    batch.add_argument('--shard', nargs=2, type=int, default=[0, 1], metavar=('INDEX', 'COUNT'),
+                       help="With --replay, process only this contiguous part of each corpus")
+    batch.add_argument('--limit', type=int, default=None, help="Posts per query (platform default if omitted)")
+    batch.add_argument('--workers', type=int, default=None, help="Concurrent queries per platform (scraper default if omitted)")
+    batch.add_argument('--jsonl', action='store_true', help="Write flagged records as JSON lines on stdout")
+    batch.add_argument('--report', choices=['full', 'incremental'], help="Generate a report after scanning")
+    batch.add_argument('--no-preload', action='store_true', help="Load models lazily instead of at startup")
+    batch.add_argument('--no-dedup', action='store_true', help="Re-classify posts already seen in earlier scans")
+    batch.add_argument('--incremental', action='store_true', help="Stop each query at posts an earlier scan already fetched")
+    batch.add_argument('--resume', action='store_true', help="Continue interrupted incremental scans (implies --incremental)")
+    batch.add_argument('--classifier-mode', choices=ClassifierEngine.MODES, default='inline',
+                       help="Run classifiers inline, on threads, or in worker processes")
+    batch.add_argument('--classifier-workers', type=int, default=None, help="Classifier threads/processes")
+    batch.add_argument('--cascade', action='store_true',
+                       help="Send only ambiguous posts to the models; keyword hits, short and non-English posts exit early")
+    batch.add_argument('--cascade-threshold', type=float, default=None,
+                       help="With --cascade, also send keyword hits to the model; a benign verdict at or above "
+                            "this score overrides the keyword match")
+    batch.add_argument('--image-model', default=None, metavar='MODULE:FACTORY',
+                       help="Batched deepfake image model (default: $CYBERSHIELD_IMAGE_MODEL, else URL heuristics)")
+    batch.add_argument('--media-index', action='store_true',
+                       help="Download media and match it against perceptual hashes of known deepfakes "
+                            "(seeded with python -m media.phash, and learned from --image-model detections)")
+    batch.add_argument('--evidence-format', choices=sorted(EXTENSIONS), default='png',
+                       help="Image format of evidence cards")
+    batch.add_argument('--evidence-compression', type=int, default=None, metavar='LEVEL',
+                       help="Evidence compression: zlib level 0-9 for png (default 1), quality 1-100 for "
+                            "webp and jpeg (default 80)")
+    batch.add_argument('--metrics', action='append', default=[], metavar='SINK',
+                       help="Export stage timers, counters and queue depths: prometheus[:[HOST:]PORT] or "
+                            "jsonl:PATH[:INTERVAL] (repeatable; default: $CYBERSHIELD_METRICS, comma-separated)")
+    batch.add_argument('--profile', choices=PROFILE_MODES, default=None,
+                       help="Profile scans, classifiers and reports into --profile-dir: cprofile writes pstats, "
+                            "sample writes collapsed stacks at low overhead (default: $CYBERSHIELD_PROFILE)")
+    batch.add_argument('--profile-dir', default=None,
+                       help="Profile output directory (default: $CYBERSHIELD_PROFILE_DIR or reports/profiles)")
+    batch.add_argument('--profile-interval', type=float, default=None,
+                       help="Seconds between stack samples with --profile sample (default: 0.01)")
+    return parser
+
+
+def start_metrics(specs: List[str]) -> List:
+    sinks = []
+    for spec in specs:
+        try:
+            sinks.append(open_sink(spec))
+        except Exception as e:
+            print(f"[!] Could not start metrics sink {spec}: {e}", file=sys.stderr)
+    return sinks
+
+
+def start_profiler(args):
+    # Batch flags win; the environment also covers the interactive menu.
+    mode = getattr(args, 'profile', None) or os.environ.get('CYBERSHIELD_PROFILE')
+    if not mode:
+        return
+    out_dir = getattr(args, 'profile_dir', None) or os.environ.get('CYBERSHIELD_PROFILE_DIR')
+    try:
+        interval = getattr(args, 'profile_interval', None) or float(os.environ.get('CYBERSHIELD_PROFILE_INTERVAL') or 0)
+        PROFILER.start(mode, out_dir, interval or None)
+    except ValueError as e:
+        print(f"[!] Profiling disabled: {e}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'batch' and not (args.twitter or args.instagram or args.replay):
+        parser.error("batch needs at least one --twitter or --instagram query or --replay corpus")
+    if args.command == 'batch' and args.evidence_compression is not None:
+        low, high = (0, 9) if args.evidence_format == 'png' else (1, 100)
+        if not low <= args.evidence_compression <= high:
+            parser.error(f"--evidence-compression for {args.evidence_format} must be {low}-{high}")
+    specs = getattr(args, 'metrics', None) or [s for s in os.environ.get('CYBERSHIELD_METRICS', '').split(',') if s]
+    sinks = start_metrics(specs)
+    start_profiler(args)
+    try:
+        if args.command == 'batch':
+            return run_batch(args)
         app = CyberShieldCLI()
-        app.run()
+        try:
+            app.run()
+        finally:
+            app.close()
+        return EXIT_OK
+    finally:
+        for sink in sinks:
+            sink.close()
+        for path in PROFILER.close():
+            print(f"[+] Profile written: {path}", file=sys.stderr)
+        if PROFILER.skipped:
+            print(f"[!] {PROFILER.skipped} calls ran unprofiled while another profiler was active", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
     except KeyboardInterrupt:
         print("\nInterrupted. Exiting.")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(EXIT_INTERRUPTED)
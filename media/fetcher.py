@@ -0,0 +1,143 @@
+import hashlib
+import http.client
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+
+class MediaTooLarge(Exception):
+    pass
+
+
+class MediaFetcher:
+    """Concurrent, size-capped media downloader with an on-disk cache.
+
+    Files are stored under ``cache_dir`` by the SHA-256 of their URL, so a
+    URL is downloaded once across runs. Keep-alive connections are pooled
+    per host and at most ``per_host`` requests run against one host at a
+    time; ``fetch_many`` spreads a batch over ``workers`` threads.
+    """
+
+    def __init__(self, cache_dir: str = 'media_cache', max_bytes: int = 10 * 1024 * 1024,
+                 workers: int = 8, per_host: int = 4, timeout: float = 10.0,
+                 user_agent: str = 'CyberShield/1.0', max_redirects: int = 3):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.max_redirects = max_redirects
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='media-fetch')
+        self._pools: Dict[Tuple[str, str, int], queue.LifoQueue] = {}
+        self._slots: Dict[Tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self._guard = threading.Lock()
+        self._failed: Dict[str, str] = {}
+
+    def path_for(self, url: str) -> str:
+        h = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, h[:2], h)
+
+    def failure(self, url: str) -> Optional[str]:
+        return self._failed.get(url)
+
+    def _host(self, url: str) -> Tuple[str, str, int]:
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Unsupported media URL: {url}")
+        return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)
+
+    def _pool(self, host: Tuple[str, str, int]):
+        with self._guard:
+            if host not in self._pools:
+                self._pools[host] = queue.LifoQueue()
+                self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._pools[host], self._slots[host]
+
+    def _connect(self, host: Tuple[str, str, int]) -> http.client.HTTPConnection:
+        scheme, hostname, port = host
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return cls(hostname, port, timeout=self.timeout)
+
+    def _get(self, url: str) -> bytes:
+        for _ in range(self.max_redirects + 1):
+            host = self._host(url)
+            pool, slot = self._pool(host)
+            parts = urlsplit(url)
+            target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+            with slot:
+                try:
+                    conn = pool.get_nowait()
+                except queue.Empty:
+                    conn = self._connect(host)
+                reusable = False
+                try:
+                    try:
+                        conn.request('GET', target, headers={'User-Agent': self.user_agent})
+                        resp = conn.getresponse()
+                    except (http.client.HTTPException, ConnectionError):
+                        # Stale keep-alive connection; retry once on a fresh one.
+                        conn.close()
+                        conn = self._connect(host)
+                        conn.request('GET', target, headers={'User-Agent': self.user_agent})
+                        resp = conn.getresponse()
+                    if resp.status in (301, 302, 303, 307, 308) and resp.getheader('Location'):
+                        resp.read()
+                        reusable = not resp.will_close
+                        url = urljoin(url, resp.getheader('Location'))
+                        continue
+                    if resp.status != 200:
+                        resp.read()
+                        reusable = not resp.will_close
+                        raise IOError(f"HTTP {resp.status}")
+                    length = resp.getheader('Content-Length')
+                    if length and length.isdigit() and int(length) > self.max_bytes:
+                        raise MediaTooLarge(f"{length} bytes")
+                    data = resp.read(self.max_bytes + 1)
+                    if len(data) > self.max_bytes:
+                        raise MediaTooLarge(f"more than {self.max_bytes} bytes")
+                    reusable = not resp.will_close
+                    return data
+                finally:
+                    if reusable:
+                        pool.put(conn)
+                    else:
+                        conn.close()
+        raise IOError("Too many redirects")
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Return the local path of ``url`` (downloading it if needed), or None on failure."""
+        path = self.path_for(url)
+        if os.path.exists(path):
+            return path
+        if url in self._failed:
+            return None  # don't retry a broken URL within one run
+        try:
+            data = self._get(url)
+        except Exception as e:
+            self._failed[url] = str(e) or e.__class__.__name__
+            return None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return path
+
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Download distinct URLs concurrently; maps each URL to its local path (or None)."""
+        urls = list(dict.fromkeys(urls))
+        return dict(zip(urls, self._executor.map(self.fetch, urls)))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._guard:
+            for pool in self._pools.values():
+                while True:
+                    try:
+                        pool.get_nowait().close()
+                    except queue.Empty:
+                        break
@@ -0,0 +1,70 @@
+import importlib
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+try:
+    from PIL import Image
+except Exception:  # pragma: no cover
+    Image = None
+
+
+def available() -> bool:
+    """True if images can be decoded into arrays (NumPy and Pillow installed)."""
+    return np is not None and Image is not None
+
+
+def load_batch(paths: Sequence[Optional[str]], size: int = 224) -> Tuple[Optional['np.ndarray'], List[int]]:
+    """Decode and resize images into one float32 (N, size, size, 3) array scaled to [0, 1].
+
+    Returns the array and the indices of ``paths`` it holds; missing or
+    undecodable files are left out. The array is None if nothing decoded.
+    """
+    if not available():
+        return None, []
+    arrays, ok = [], []
+    for i, path in enumerate(paths):
+        if not path:
+            continue
+        try:
+            with Image.open(path) as img:
+                img = img.convert('RGB').resize((size, size), Image.BILINEAR)
+                arrays.append(np.asarray(img, dtype=np.uint8))
+        except Exception:
+            continue
+        ok.append(i)
+    if not arrays:
+        return None, []
+    return np.stack(arrays).astype(np.float32) / 255.0, ok
+
+
+class ImageModel(ABC):
+    """Interface of a batched deepfake image model.
+
+    ``predict`` gets a (N, H, W, 3) float32 batch in [0, 1] and returns one
+    manipulation probability per image. ``name`` identifies the model in
+    the result cache.
+    """
+
+    name = 'image-model'
+    input_size = 224
+
+    @abstractmethod
+    def predict(self, batch) -> Sequence[float]:
+        """One manipulation probability per image in ``batch``."""
+
+
+def load_image_model(spec: Optional[str]) -> Optional[ImageModel]:
+    """Build a model from a ``module:factory`` spec (e.g. from CYBERSHIELD_IMAGE_MODEL)."""
+    if not spec:
+        return None
+    module, _, attr = spec.partition(':')
+    factory = getattr(importlib.import_module(module), attr or 'load_model')
+    model = factory()
+    if not callable(getattr(model, 'predict', None)):  # duck-typed models skip the ImageModel check
+        raise TypeError(f"{spec} returned {type(model).__name__}, which has no predict()")
+    return model
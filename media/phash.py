@@ -0,0 +1,199 @@
+import argparse
+import sys
+import threading
+from array import array
+from itertools import combinations
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+try:
+    from PIL import Image
+except Exception:  # pragma: no cover
+    Image = None
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bool(bit))
+    return value
+
+
+def dhash(path: str) -> Optional[int]:
+    """64-bit difference hash: brightness gradients of a 9x8 grayscale thumbnail."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            px = list(img.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    except Exception:
+        return None
+    return _bits_to_int(px[row * 9 + col] > px[row * 9 + col + 1] for row in range(8) for col in range(8))
+
+
+def _dct_matrix(n: int):
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+    m[0] *= 1 / np.sqrt(2)
+    return m * np.sqrt(2 / n)
+
+
+def phash(path: str) -> Optional[int]:
+    """64-bit DCT hash: low-frequency 8x8 DCT coefficients of a 32x32 thumbnail against their median."""
+    if Image is None or np is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            px = np.asarray(img.convert('L').resize((32, 32), Image.LANCZOS), dtype=np.float64)
+    except Exception:
+        return None
+    d = _dct_matrix(32)
+    low = (d @ px @ d.T)[:8, :8].flatten()
+    return _bits_to_int(low > np.median(low[1:]))
+
+
+HASHERS: Dict[str, Callable[[str], Optional[int]]] = {'dhash': dhash, 'phash': phash}
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class Match(NamedTuple):
+    distance: int
+    hash: int
+    label: str
+    ref: Optional[str]
+    confidence: float
+
+
+class HashIndex:
+    """Near-duplicate lookup over 64-bit perceptual hashes (multi-index hashing).
+
+    Hashes live in a compact ``array('Q')``; each is split into ``chunks``
+    equal bit fields with one table per field. Two hashes within
+    ``max_distance`` bits agree to within ``max_distance // chunks`` bits on
+    at least one field, so a lookup probes only those few neighbours per
+    table and verifies the candidates with a full Hamming distance. With a
+    ``db`` the index is loaded from and persisted to ``media_hashes``.
+    """
+
+    def __init__(self, db=None, kind: str = 'dhash', max_distance: int = 8, chunks: int = 8):
+        if kind not in HASHERS:
+            raise ValueError(f"Unknown hash kind: {kind}")
+        if 64 % chunks:
+            raise ValueError("chunks must divide 64")
+        self.db = db
+        self.kind = kind
+        self.max_distance = max_distance
+        self.chunks = chunks
+        self._width = 64 // chunks
+        self._mask = (1 << self._width) - 1
+        self._hashes = array('Q')
+        self._labels: List[str] = []
+        self._refs: List[Optional[str]] = []
+        self._confidence = array('d')
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(chunks)]
+        self._known = set()
+        self._lock = threading.Lock()
+        if db is not None:
+            for h, label, ref, confidence in db.iter_media_hashes(kind):
+                self._add(h, label, ref, confidence)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def hash_file(self, path: str) -> Optional[int]:
+        return HASHERS[self.kind](path)
+
+    def _fields(self, h: int):
+        return ((h >> (i * self._width)) & self._mask for i in range(self.chunks))
+
+    def _add(self, h: int, label: str, ref: Optional[str], confidence: float) -> bool:
+        if (h, label) in self._known:
+            return False
+        self._known.add((h, label))
+        pos = len(self._hashes)
+        self._hashes.append(h)
+        self._labels.append(label)
+        self._refs.append(ref)
+        self._confidence.append(confidence)
+        for table, field in zip(self._tables, self._fields(h)):
+            table.setdefault(field, []).append(pos)
+        return True
+
+    def add(self, h: int, label: str, ref: Optional[str] = None, confidence: float = 1.0):
+        with self._lock:
+            added = self._add(h, label, ref, confidence)
+        if added and self.db is not None:
+            self.db.add_media_hashes(self.kind, [(h, label, ref, confidence)])
+
+    def add_file(self, path: str, label: str, ref: Optional[str] = None, confidence: float = 1.0) -> Optional[int]:
+        """Hash an image file and index it; returns the hash, or None if it could not be hashed."""
+        h = self.hash_file(path)
+        if h is not None:
+            self.add(h, label, ref or path, confidence)
+        return h
+
+    def _neighbours(self, field: int, radius: int):
+        yield field
+        for r in range(1, radius + 1):
+            for bits in combinations(range(self._width), r):
+                flip = 0
+                for b in bits:
+                    flip |= 1 << b
+                yield field ^ flip
+
+    def lookup(self, h: int, max_distance: Optional[int] = None, label: Optional[str] = None) -> List[Match]:
+        """All indexed hashes within ``max_distance`` of ``h``, nearest first."""
+        max_distance = self.max_distance if max_distance is None else max_distance
+        radius = max_distance // self.chunks
+        with self._lock:
+            candidates = set()
+            for table, field in zip(self._tables, self._fields(h)):
+                for probe in self._neighbours(field, radius):
+                    candidates.update(table.get(probe, ()))
+            matches = []
+            for pos in candidates:
+                if label is not None and self._labels[pos] != label:
+                    continue
+                d = hamming(h, self._hashes[pos])
+                if d <= max_distance:
+                    matches.append(Match(d, self._hashes[pos], self._labels[pos], self._refs[pos], self._confidence[pos]))
+        matches.sort()
+        return matches
+
+    def nearest(self, h: int, max_distance: Optional[int] = None, label: Optional[str] = None) -> Optional[Match]:
+        matches = self.lookup(h, max_distance, label)
+        return matches[0] if matches else None
+
+
+if __name__ == '__main__':
+    from storage.database import Database
+    from .fetcher import MediaFetcher
+
+    parser = argparse.ArgumentParser(description="Seed the media hash index with known flagged images.")
+    parser.add_argument('images', nargs='+', help="Image files or http(s) URLs")
+    parser.add_argument('--label', default='deepfake', help="Label to match them under (default: deepfake)")
+    parser.add_argument('--confidence', type=float, default=1.0, help="Confidence reported for matches")
+    parser.add_argument('--kind', choices=sorted(HASHERS), default='dhash')
+    parser.add_argument('--db', default='cybershield.db')
+    args = parser.parse_args()
+    index = HashIndex(Database(args.db), kind=args.kind)
+    fetcher = MediaFetcher()
+    failed = 0
+    for item in args.images:
+        path = fetcher.fetch(item) if item.startswith(('http://', 'https://')) else item
+        h = index.add_file(path, args.label, item, args.confidence) if path else None
+        if h is None:
+            failed += 1
+            print(f"[!] Could not hash {item}", file=sys.stderr)
+        else:
+            print(f"[+] {item}: {h:016x}")
+    fetcher.close()
+    print(f"[+] Index now holds {len(index)} hashes")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,127 @@
+import csv
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Iterable, Iterator, Optional
+
+from .concurrency import RateLimiter, fetch_concurrently
+from .cursor import CursorRun
+from storage.corpus import open_backup
+from storage.records import Post
+from engine.metrics import METRICS
+
+
+class Scraper(ABC):
+    """Fetching, backup fallback and scrape cursors shared by the platform scrapers.
+
+    A subclass names its ``platform``, reports whether its scraping library
+    is ``available`` and yields live posts from ``_iter_live``.
+    """
+
+    platform = ''
+    max_concurrency = 1
+    min_interval = 1.0  # seconds between requests
+    default_limit = 20
+    cursor_field = 'post_id'  # the Post field holding the cursor position
+    cursor_order: Callable = str
+
+    def __init__(self, backup_path: str, cursors=None):
+        self.backup_path = backup_path
+        self.cursors = cursors  # store with load_cursor/save_cursor (e.g. storage.Database) enables incremental fetches
+        self.limiter = RateLimiter(self.min_interval)
+        self._runs: Dict[str, CursorRun] = {}  # latest cursor run per query, advanced by commit()
+
+    @property
+    @abstractmethod
+    def available(self) -> bool:
+        """False when the scraping library is missing; every fetch then serves the backup."""
+
+    @abstractmethod
+    def _iter_live(self, query: str, limit: int, resume: bool = False) -> Iterator[Post]:
+        """Live posts for ``query``, newest first, reporting each to the cursor run (see ``_cursor_run``)."""
+
+    def _cursor_run(self, query: str, resume: bool) -> Optional[CursorRun]:
+        if self.cursors is None:
+            return None
+        run = self._runs[query] = CursorRun(self.cursors, self.platform, query, self.cursor_order, resume)
+        return run
+
+    def commit(self, posts: Iterable[Post]):
+        """Move the cursors past ``posts`` once they are persisted (see CursorRun); no-op without a cursor store."""
+        runs = {}
+        for post in posts:
+            run = self._runs.get(post.get('query'))
+            if run is not None and post.get(self.cursor_field) is not None:
+                run.persisted(post.get(self.cursor_field))
+                runs[id(run)] = run
+        for run in runs.values():
+            run.checkpoint()
+
+    def fetch(self, query: str, limit: Optional[int] = None, resume: bool = False) -> List[Post]:
+        return list(self.iter_fetch(query, limit, resume))
+
+    def iter_fetch(self, query: str, limit: Optional[int] = None, resume: bool = False) -> Iterator[Post]:
+        """Yield posts as they are scraped, falling back to the backup if nothing arrives.
+
+        With a cursor store the fetch stops at content an earlier scan saw,
+        and ``resume`` continues an interrupted scan from where it stopped.
+        """
+        if not self.available:
+            yield from self.iter_backup()
+            return
+        count = 0
+        try:
+            for post in self._iter_live(query, limit or self.default_limit, resume):
+                yield post
+                count += 1
+        except Exception:
+            if count:
+                return
+            yield from self.iter_backup()
+            return
+        if not count and self.cursors is None:  # with cursors, no posts just means nothing new
+            yield from self.iter_backup()
+
+    def fetch_many(self, queries: List[str], limit: Optional[int] = None, max_workers: Optional[int] = None,
+                   resume: bool = False,
+                   on_error: Optional[Callable[[str, BaseException], None]] = None) -> Iterator[Post]:
+        """Fetch many queries in parallel, yielding posts (tagged with ``query``) as they arrive.
+
+        A query that fails is dropped, counted and passed to ``on_error(query, exc)``.
+        """
+        if not self.available:
+            yield from self.iter_backup()
+            return
+
+        def failed(query: str, exc: BaseException):
+            METRICS.inc('query_failures_total', platform=self.platform)
+            if on_error is not None:
+                on_error(query, exc)
+
+        count = 0
+        for post in fetch_concurrently(lambda q, n: self._iter_live(q, n, resume), queries, limit or self.default_limit,
+                                       max_workers or self.max_concurrency, self.limiter, on_error=failed):
+            yield post
+            count += 1
+        if not count and self.cursors is None:
+            yield from self.iter_backup()
+
+    def load_backup(self) -> List[Post]:
+        return list(self.iter_backup())
+
+    def iter_backup(self) -> Iterator[Post]:
+        """Backup posts: the memory-mapped corpus next to the CSV when there is one (see storage.corpus).
+
+        The corpus stays open only while the iterator runs; it is closed when
+        iteration ends or the iterator is closed early.
+        """
+        METRICS.inc('backup_fallbacks_total', platform=self.platform)
+        corpus = open_backup(self.backup_path)
+        if corpus is not None:
+            with corpus:
+                yield from corpus
+            return
+        if not os.path.exists(self.backup_path):
+            return
+        with open(self.backup_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                yield Post(self.platform, row.get('username'), row.get('content') or '', row.get('link'))
@@ -0,0 +1,219 @@
+import json
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Iterable, List, Optional
+
+try:
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+except Exception:  # pragma: no cover
+    webdriver = None
+
+    class WebDriverException(Exception):
+        pass
+
+
+def chrome_factory(headless: bool = True, profile_directory: str = 'Default',
+                   extra_args: Iterable[str] = ()) -> Callable[[str], object]:
+    """Driver factory for Chrome; each worker gets its own ``--user-data-dir``."""
+    extra_args = list(extra_args)
+
+    def create(profile_dir: str):
+        if webdriver is None:
+            raise RuntimeError("selenium not installed")
+        options = webdriver.ChromeOptions()
+        options.add_argument(f"--user-data-dir={profile_dir}")
+        options.add_argument(f"--profile-directory={profile_directory}")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--disable-dev-shm-usage")
+        if headless:
+            options.add_argument("--headless=new")
+        for arg in extra_args:
+            options.add_argument(arg)
+        return webdriver.Chrome(options=options)
+    return create
+
+
+def firefox_factory(headless: bool = True, binary_path: Optional[str] = None) -> Callable[[str], object]:
+    """Driver factory for Firefox; each worker gets its own ``-profile`` directory."""
+    def create(profile_dir: str):
+        if webdriver is None:
+            raise RuntimeError("selenium not installed")
+        options = webdriver.FirefoxOptions()
+        options.add_argument("-profile")
+        options.add_argument(profile_dir)
+        if headless:
+            options.add_argument("-headless")
+        firefox_bin = binary_path or os.environ.get("FIREFOX_BIN")
+        if firefox_bin:
+            options.binary_location = firefox_bin
+        return webdriver.Firefox(options=options)
+    return create
+
+
+class CookieSession:
+    """Saved login cookies for one site, shared by every browser in a pool."""
+
+    def __init__(self, path: str, url: str):
+        self.path = path
+        self.url = url
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def restore(self, driver) -> bool:
+        """Load the saved cookies into ``driver`` (opening the site first); False if there are none."""
+        with self._lock:
+            if not self.exists():
+                return False
+            with open(self.path, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        driver.get(self.url)
+        for cookie in cookies:
+            cookie.pop('sameSite', None)  # not accepted back by every driver
+            try:
+                driver.add_cookie(cookie)
+            except WebDriverException:
+                pass  # Non-critical
+        driver.get(self.url)
+        return True
+
+    def save(self, driver):
+        cookies = driver.get_cookies()
+        with self._lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f)
+            os.replace(tmp, self.path)
+
+
+def is_alive(driver) -> bool:
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+class BrowserPool:
+    """N browser workers, each with an isolated profile directory, fed from one job queue.
+
+    A job is a callable taking a driver; ``submit`` returns a Future for its
+    result. ``setup(driver, index)`` runs after every (re)start, e.g. to
+    restore a ``CookieSession`` or log in. A job that kills its browser is
+    retried on a fresh one, up to ``max_restarts`` restarts per worker.
+    """
+
+    def __init__(self, factory: Callable[[str], object], size: int = 2, profile_root: str = 'browser_profiles',
+                 setup: Optional[Callable[[object, int], None]] = None, max_restarts: int = 3,
+                 job_retries: int = 1):
+        self.factory = factory
+        self.size = max(1, size)
+        self.profile_root = profile_root
+        self.setup = setup
+        self.max_restarts = max_restarts
+        self.job_retries = job_retries
+        self.restarts = 0
+        self._jobs: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._worker, args=(i,), name=f'browser-{i}', daemon=True)
+            for i in range(self.size)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _start(self, index: int):
+        profile_dir = os.path.join(self.profile_root, f"worker-{index}")
+        os.makedirs(profile_dir, exist_ok=True)
+        driver = self.factory(profile_dir)
+        if self.setup is not None:
+            try:
+                self.setup(driver, index)
+            except Exception:
+                driver.quit()
+                raise
+        return driver
+
+    def _restart(self, index: int, driver):
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass  # Non-critical
+        with self._lock:
+            self.restarts += 1
+        return self._start(index)
+
+    def _worker(self, index: int):
+        driver = None
+        restarts = 0
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                break
+            job, fut = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            attempts = 0
+            while True:
+                try:
+                    if driver is None:
+                        driver = self._start(index)
+                    fut.set_result(job(driver))
+                    break
+                except Exception as e:
+                    crashed = driver is None or not is_alive(driver)
+                    if not crashed or attempts >= self.job_retries or restarts >= self.max_restarts:
+                        if crashed and driver is not None:
+                            try:
+                                driver.quit()
+                            except Exception:
+                                pass  # Non-critical
+                            driver = None  # start fresh for the next job
+                        fut.set_exception(e)
+                        break
+                    attempts += 1
+                    restarts += 1
+                    try:
+                        driver = self._restart(index, driver)
+                    except Exception as start_error:
+                        driver = None
+                        fut.set_exception(start_error)
+                        break
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass  # Non-critical
+
+    def submit(self, job: Callable[[object], object]) -> Future:
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        fut: Future = Future()
+        self._jobs.put((job, fut))
+        return fut
+
+    def map(self, job: Callable[[object, object], object], items: Iterable) -> List[Future]:
+        """Submit ``job(driver, item)`` for every item; futures are in input order."""
+        return [self.submit(lambda driver, item=item: job(driver, item)) for item in items]
+
+    def close(self, wait: bool = True):
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._jobs.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,97 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+RATE_LIMIT_MARKERS = ("429", "too many requests", "rate limit", "please wait a few minutes")
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    text = f"{exc.__class__.__name__} {exc}".lower()
+    return any(m in text for m in RATE_LIMIT_MARKERS) or 'toomanyrequests' in text
+
+
+class RateLimiter:
+    """Spaces out request starts for one platform and backs off after rate-limit errors."""
+
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def backoff(self, seconds: float):
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+_DONE = object()
+
+
+def fetch_concurrently(fetch_one: Callable[[str, int], Iterable[Dict]], queries: List[str], limit: int,
+                       max_workers: int, limiter: RateLimiter, retries: int = 2,
+                       backoff: float = 30.0, queue_size: int = 256,
+                       on_error: Optional[Callable[[str, BaseException], None]] = None) -> Iterator[Dict]:
+    """Run ``fetch_one(query, limit)`` for many queries on a worker pool.
+
+    Posts are yielded as soon as any worker produces them, tagged with their
+    ``query``. Rate-limited queries are retried after a shared back-off;
+    other failures drop that query only and are passed to ``on_error(query, exc)``.
+    """
+    out: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker(query: str):
+        try:
+            for attempt in range(retries + 1):
+                limiter.wait()
+                sent = 0
+                try:
+                    for post in fetch_one(query, limit):
+                        post['query'] = query
+                        if not put(post):
+                            return
+                        sent += 1
+                    return
+                except Exception as e:
+                    # Retry only if nothing was delivered yet, to avoid duplicates.
+                    if sent or not is_rate_limited(e) or attempt == retries:
+                        if on_error is not None:
+                            on_error(query, e)
+                        return
+                    limiter.backoff(backoff * (attempt + 1))
+        finally:
+            put(_DONE)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        for q in queries:
+            pool.submit(worker, q)
+        remaining = len(queries)
+        while remaining:
+            item = out.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        stop.set()  # workers blocked on a full queue notice this and exit
+        pool.shutdown(wait=False, cancel_futures=True)
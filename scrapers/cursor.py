@@ -0,0 +1,106 @@
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+
+class CursorRun:
+    """Tracks one fetch of a query against its persisted scan position.
+
+    Positions are strings the scraper knows how to order (tweet ids,
+    ISO timestamps). ``last`` is the newest post of the last complete scan;
+    an incomplete scan (limit hit, error, interrupt) leaves ``pending`` (its
+    newest post) and ``resume`` (the oldest post it processed) so a later
+    resume run can fill the gap between ``resume`` and ``last``. Plain runs
+    stop at ``pending`` as well, so a query with more new posts than the
+    fetch limit still moves forward on every poll.
+
+    The scraper calls ``fetched`` for each post it yields, newest first, and
+    the scan calls ``persisted`` once the post is stored and ``checkpoint``
+    after each write; the cursor only moves past a post once it and every
+    newer post fetched before it are persisted, so a crash never skips
+    posts that were fetched but not yet stored.
+    """
+
+    def __init__(self, store, platform: str, query: str, order: Callable = str, resume: bool = False):
+        self.store = store
+        self.platform = platform
+        self.query = query
+        self.order = order
+        state = store.load_cursor(platform, query)
+        self.last: Optional[str] = state['last']
+        self.pending: Optional[str] = state['pending']
+        self.gap: Optional[str] = state['resume']
+        self.start_below: Optional[str] = self.gap if resume else None
+        self.resuming = self.start_below is not None
+        self.newest: Optional[str] = None
+        self.oldest: Optional[str] = None
+        self._lock = threading.Lock()
+        self._unpersisted: deque = deque()  # fetched positions, newest first
+        self._persisted = set()
+        self._complete: Optional[bool] = None  # set by finish()
+
+    @property
+    def stop(self) -> Optional[str]:
+        """Position at which the fetch stops: the last complete scan, or the newest post of an incomplete one."""
+        if self.resuming:
+            return self.last
+        return self._max(self.last, self.pending)
+
+    def _max(self, a, b):
+        if a is None or b is None:
+            return a if b is None else b
+        return a if self.order(a) >= self.order(b) else b
+
+    def seen(self, pos: str) -> bool:
+        """True once the fetch reaches content an earlier scan covered."""
+        stop = self.stop
+        return stop is not None and self.order(pos) <= self.order(stop)
+
+    def skip(self, pos: str) -> bool:
+        """True for posts above the resume point (already processed by the interrupted scan)."""
+        return self.start_below is not None and self.order(pos) >= self.order(self.start_below)
+
+    def fetched(self, pos: str):
+        with self._lock:
+            self._unpersisted.append(pos)
+
+    def persisted(self, pos: str):
+        with self._lock:
+            self._persisted.add(pos)
+            # Advance over the contiguous run of persisted posts at the newest end.
+            while self._unpersisted and self._unpersisted[0] in self._persisted:
+                done = self._unpersisted.popleft()
+                self._persisted.discard(done)
+                self.newest = self._max(self.newest, done)
+                if self.oldest is None or self.order(done) < self.order(self.oldest):
+                    self.oldest = done
+
+    def finish(self, complete: bool):
+        """Called by the scraper when the fetch ends; the final position is saved once everything is persisted."""
+        with self._lock:
+            self._complete = complete
+        self.checkpoint()
+
+    def checkpoint(self):
+        with self._lock:
+            if self._complete is not None and not self._unpersisted:
+                self._save_final()
+            else:
+                self._save_incomplete()
+
+    def _save_incomplete(self):
+        if self.oldest is None:
+            return  # nothing persisted; keep any earlier resume point
+        self.store.save_cursor(self.platform, self.query, self.last, self._max(self.pending, self.newest), self.oldest)
+
+    def _save_final(self):
+        if not self._complete:
+            self._save_incomplete()
+        elif self.resuming:
+            newest = self._max(self.newest, self.pending)
+            self.store.save_cursor(self.platform, self.query, self._max(self.last, newest), None, None)
+        elif self.pending is not None:
+            # Caught up with the newest incomplete scan; its gap is still open for a resume run.
+            self.store.save_cursor(self.platform, self.query, self.last, self._max(self.pending, self.newest), self.gap)
+        else:
+            self.store.save_cursor(self.platform, self.query, self._max(self.last, self.newest), None, None)
@@ -1,6 +1,9 @@
-import csv
-from typing import List, Dict
-import os
+import queue
+import threading
+from typing import Iterator, Optional
+
+from .base import Scraper
+from storage.records import Post
 
 try:
     import instaloader
@@ -8,39 +11,77 @@ except Exception:  # pragma: no cover
     instaloader = None
 
 
-class InstagramScraper:
-    def __init__(self, backup_path: str = 'backup/instagram_backup.csv'):
-        self.backup_path = backup_path
+class InstagramScraper(Scraper):
+    platform = 'instagram'
+    max_concurrency = 2
+    min_interval = 2.0  # seconds between hashtag requests
+    default_limit = 20
+    cursor_field = 'posted_at'
+    cursor_order = str
+
+    def __init__(self, backup_path: str = 'backup/instagram_backup.csv', session_user: Optional[str] = None,
+                 session_file: Optional[str] = None, cursors=None):
+        super().__init__(backup_path, cursors)
+        self.session_user = session_user
+        self.session_file = session_file
+        self._loaders: queue.Queue = queue.Queue()
+        self._loader_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return instaloader is not None
+
+    def _new_loader(self):
+        L = instaloader.Instaloader(download_pictures=False, save_metadata=False, download_comments=False, quiet=True)
+        if self.session_user:
+            try:
+                L.load_session_from_file(self.session_user, self.session_file)
+            except Exception:
+                pass  # anonymous session
+        return L
 
-    def fetch(self, hashtag: str, limit: int = 20) -> List[Dict]:
-        if not instaloader:
-            return self.load_backup()
-        posts = []
+    def _checkout(self):
+        # Instaloader contexts (and their HTTP sessions) are reused across calls;
+        # each concurrent fetch borrows its own so requests never interleave.
+        try:
+            return self._loaders.get_nowait()
+        except queue.Empty:
+            with self._loader_lock:
+                return self._new_loader()
+
+    def _iter_live(self, hashtag: str, limit: int, resume: bool = False) -> Iterator[Post]:
+        run = self._cursor_run(hashtag, resume)
+        L = self._checkout()
+        count = 0
+        complete = False
         try:
-            L = instaloader.Instaloader(download_pictures=False, save_metadata=False, download_comments=False, quiet=True)
             hashtag_obj = instaloader.Hashtag.from_name(L.context, hashtag)
-            for i, post in enumerate(hashtag_obj.get_posts()):
-                if i >= limit:
+            for post in hashtag_obj.get_posts():
+                # ISO timestamps of the same format order correctly as strings.
+                pos = post.date_utc.isoformat()
+                if run is not None and run.seen(pos):
+                    complete = True
+                    break
+                if run is not None and run.skip(pos):
+                    continue
+                if count >= limit:
                     break
-                posts.append({
-                    'platform': 'instagram',
-                    'username': post.owner_username,
-                    'content': post.caption or '',
-                    'link': f"https://www.instagram.com/p/{post.shortcode}/",
-                    'media': [post.url] if hasattr(post, 'url') else []
-                })
-        except Exception:
-            return self.load_backup()
-        return posts or self.load_backup()
-
-    def load_backup(self) -> List[Dict]:
-        data = []
-        if not os.path.exists(self.backup_path):
-            return data
-        with open(self.backup_path, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row['platform'] = 'instagram'
-                row['media'] = []
-                data.append(row)
-        return data
\ No newline at end of file
+                yield Post(
+                    platform='instagram',
+                    username=post.owner_username,
+                    content=post.caption or '',
+                    link=f"https://www.instagram.com/p/{post.shortcode}/",
+                    media=[post.url] if hasattr(post, 'url') else [],
+                    post_id=post.shortcode,
+                    posted_at=pos,
+                    query=hashtag,
+                )
+                count += 1
+                if run is not None:
+                    run.fetched(pos)
+            else:
+                complete = True
+        finally:
+            self._loaders.put(L)
+            if run is not None:
+                run.finish(complete)
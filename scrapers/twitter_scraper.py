@@ -1,45 +1,65 @@
-import csv
-from typing import List, Dict
+from typing import Iterator
+
+from .base import Scraper
+from storage.records import Post
 
 try:
     import snscrape.modules.twitter as sntwitter
 except Exception:  # pragma: no cover - environment fallback
     sntwitter = None
 
-import os
 
+class TwitterScraper(Scraper):
+    platform = 'twitter'
+    max_concurrency = 4
+    min_interval = 0.5  # seconds between search requests
+    default_limit = 30
+    cursor_field = 'post_id'
+    cursor_order = int
+
+    def __init__(self, backup_path: str = 'backup/twitter_backup.csv', cursors=None):
+        super().__init__(backup_path, cursors)
 
-class TwitterScraper:
-    def __init__(self, backup_path: str = 'backup/twitter_backup.csv'):
-        self.backup_path = backup_path
+    @property
+    def available(self) -> bool:
+        return sntwitter is not None
 
-    def fetch(self, query: str, limit: int = 30) -> List[Dict]:
-        if not sntwitter:
-            return self.load_backup()
-        results = []
+    def _iter_live(self, query: str, limit: int, resume: bool = False) -> Iterator[Post]:
+        run = self._cursor_run(query, resume)
+        search = query
+        if run is not None:
+            # Let the search itself skip ids a previous scan already covered.
+            if run.stop:
+                search += f" since_id:{run.stop}"
+            if run.start_below:
+                search += f" max_id:{int(run.start_below) - 1}"
+        count = 0
+        complete = False
         try:
-            for i, tweet in enumerate(sntwitter.TwitterSearchScraper(query).get_items()):
-                if i >= limit:
+            for tweet in sntwitter.TwitterSearchScraper(search).get_items():
+                pos = str(tweet.id)
+                if run is not None and run.seen(pos):
+                    complete = True
                     break
-                results.append({
-                    'platform': 'twitter',
-                    'username': tweet.user.username if getattr(tweet, 'user', None) else 'unknown',
-                    'content': tweet.rawContent if hasattr(tweet, 'rawContent') else getattr(tweet, 'content', ''),
-                    'link': f"https://twitter.com/{tweet.user.username}/status/{tweet.id}" if getattr(tweet, 'user', None) else '',
-                    'media': [m.fullUrl for m in getattr(tweet, 'media', [])] if getattr(tweet, 'media', None) else []
-                })
-        except Exception:
-            return self.load_backup()
-        return results or self.load_backup()
-
-    def load_backup(self) -> List[Dict]:
-        data = []
-        if not os.path.exists(self.backup_path):
-            return data
-        with open(self.backup_path, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row['platform'] = 'twitter'
-                row['media'] = []
-                data.append(row)
-        return data
\ No newline at end of file
+                if run is not None and run.skip(pos):
+                    continue
+                if count >= limit:
+                    break
+                yield Post(
+                    platform='twitter',
+                    username=tweet.user.username if getattr(tweet, 'user', None) else 'unknown',
+                    content=tweet.rawContent if hasattr(tweet, 'rawContent') else getattr(tweet, 'content', ''),
+                    link=f"https://twitter.com/{tweet.user.username}/status/{tweet.id}" if getattr(tweet, 'user', None) else '',
+                    media=[m.fullUrl for m in getattr(tweet, 'media', [])] if getattr(tweet, 'media', None) else [],
+                    post_id=pos,
+                    posted_at=tweet.date.isoformat() if getattr(tweet, 'date', None) else None,
+                    query=query,
+                )
+                count += 1
+                if run is not None:
+                    run.fetched(pos)
+            else:
+                complete = True
+        finally:
+            if run is not None:
+                run.finish(complete)
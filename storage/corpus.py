@@ -0,0 +1,199 @@
+import argparse
+import csv
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, Optional, Sequence
+
+from .records import Post
+
+
+MAGIC = b'CSCORP01'
+# magic, record count, index offset
+HEADER = struct.Struct('<8sQQ')
+LENGTH = struct.Struct('<I')
+NULL = 0xFFFFFFFF
+FIELDS = ('platform', 'username', 'content', 'link', 'media', 'post_id', 'posted_at', 'query')
+
+
+def _encode(post) -> bytes:
+    parts = []
+    for name in FIELDS:
+        value = post.get(name)
+        if name == 'media':
+            value = '\n'.join(value) if value else None
+        if value is None:
+            parts.append(LENGTH.pack(NULL))
+        else:
+            data = str(value).encode('utf-8')
+            parts.append(LENGTH.pack(len(data)))
+            parts.append(data)
+    body = b''.join(parts)
+    return LENGTH.pack(len(body)) + body
+
+
+class CorpusWriter:
+    """Writes posts as length-prefixed UTF-8 records followed by a uint64 offset index.
+
+    The file is written under a temporary name and renamed on ``close``, so
+    readers never see a partial corpus.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp = f"{path}.tmp"
+        self._f = open(self._tmp, 'wb')
+        self._f.write(HEADER.pack(MAGIC, 0, 0))
+        self._offsets = []
+
+    def append(self, post):
+        self._offsets.append(self._f.tell())
+        self._f.write(_encode(post))
+
+    def extend(self, posts: Iterable):
+        for post in posts:
+            self.append(post)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def close(self):
+        if self._f.closed:
+            return
+        index_offset = self._f.tell()
+        self._f.write(struct.pack(f'<{len(self._offsets)}Q', *self._offsets))
+        self._f.seek(0)
+        self._f.write(HEADER.pack(MAGIC, len(self._offsets), index_offset))
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+            os.remove(self._tmp)
+
+
+class Corpus(Sequence):
+    """Read-only, memory-mapped replay corpus with O(1) random access.
+
+    Records are decoded lazily on access. ``shard`` splits the corpus into
+    contiguous views for parallel workers; a view pickles as its path and
+    range, so each process maps the file itself.
+    """
+
+    def __init__(self, path: str, start: int = 0, stop: Optional[int] = None):
+        self.path = path
+        self._f = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._f.close()
+            raise ValueError(f"Not a corpus file: {path}")
+        magic, count, index_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a corpus file: {path}")
+        self.total = count
+        self._index = memoryview(self._mm)[index_offset:index_offset + 8 * count].cast('Q')
+        self._range = range(count)[start:stop]
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def _decode(self, offset: int) -> Post:
+        mm = self._mm
+        pos = offset + LENGTH.size  # skip the record length
+        values = []
+        for _ in FIELDS:
+            (n,) = LENGTH.unpack_from(mm, pos)
+            pos += LENGTH.size
+            if n == NULL:
+                values.append(None)
+            else:
+                values.append(mm[pos:pos + n].decode('utf-8'))
+                pos += n
+        fields = dict(zip(FIELDS, values))
+        fields['media'] = fields['media'].split('\n') if fields['media'] else ()
+        fields['content'] = fields['content'] or ''
+        return Post(**fields)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            r = self._range[i]
+            if r.step != 1:
+                return [self._decode(self._index[j]) for j in r]
+            return Corpus(self.path, r.start, r.stop)
+        return self._decode(self._index[self._range[i]])
+
+    def __iter__(self) -> Iterator[Post]:
+        index = self._index
+        for j in self._range:
+            yield self._decode(index[j])
+
+    def shard(self, index: int, count: int) -> 'Corpus':
+        """The ``index``-th of ``count`` contiguous, near-equal parts of this corpus."""
+        n = len(self)
+        return self[n * index // count:n * (index + 1) // count]
+
+    def close(self):
+        if getattr(self, '_index', None) is not None:
+            self._index.release()
+            self._index = None
+        if not self._mm.closed:
+            self._mm.close()
+        self._f.close()
+
+    def __getstate__(self):
+        return {'path': self.path, 'start': self._range.start, 'stop': self._range.stop}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['start'], state['stop'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def corpus_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + '.corpus'
+
+
+def convert_csv(csv_path: str, out_path: Optional[str] = None, platform: Optional[str] = None) -> int:
+    """Convert a backup CSV (username, content, link[, media ...]) into a corpus; returns the record count."""
+    out_path = out_path or corpus_path(csv_path)
+    with open(csv_path, newline='', encoding='utf-8') as f, CorpusWriter(out_path) as writer:
+        for row in csv.DictReader(f):
+            media = row.get('media')
+            writer.append(Post(
+                row.get('platform') or platform, row.get('username'), row.get('content') or '', row.get('link'),
+                media.split() if media else (), row.get('post_id') or None, row.get('posted_at') or None,
+            ))
+        return len(writer)
+
+
+def open_backup(csv_path: str) -> Optional[Corpus]:
+    """The corpus converted from ``csv_path``, if one exists and is not older than the CSV."""
+    path = corpus_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    if os.path.exists(csv_path) and os.path.getmtime(path) < os.path.getmtime(csv_path):
+        return None
+    return Corpus(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert backup CSVs into memory-mapped replay corpora.")
+    parser.add_argument('csv', nargs='+', help="Backup CSV files")
+    parser.add_argument('--platform', help="Platform for rows without a platform column (default: from file name)")
+    args = parser.parse_args()
+    for path in args.csv:
+        platform = args.platform or os.path.basename(path).split('_')[0]
+        n = convert_csv(path, platform=platform)
+        print(f"[+] {path} -> {corpus_path(path)} ({n} records)")
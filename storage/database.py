@@ -1,7 +1,13 @@
 import sqlite3
-from typing import Dict, List
+import threading
+import weakref
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import os
 
+from .records import FlaggedRecord, RecordBatch
+from engine.metrics import METRICS
+
 
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS flagged_posts (
@@ -15,33 +21,321 @@ CREATE TABLE IF NOT EXISTS flagged_posts (
 );
 """
 
+# Applied in order; PRAGMA user_version records how many have run.
+MIGRATIONS = [
+    [
+        "CREATE INDEX IF NOT EXISTS idx_flagged_platform ON flagged_posts(platform, id)",
+        "CREATE INDEX IF NOT EXISTS idx_flagged_category ON flagged_posts(category, id)",
+        "CREATE INDEX IF NOT EXISTS idx_flagged_username ON flagged_posts(username, id)",
+        "CREATE INDEX IF NOT EXISTS idx_flagged_timestamp ON flagged_posts(timestamp)",
+    ],
+    [
+        # Report watermarks and per-category counters kept current at insert time.
+        "CREATE TABLE IF NOT EXISTS report_state (name TEXT PRIMARY KEY, last_id INTEGER, last_timestamp TEXT)",
+        "CREATE TABLE IF NOT EXISTS category_counters (category TEXT PRIMARY KEY, count INTEGER NOT NULL)",
+        "INSERT OR REPLACE INTO category_counters(category, count) "
+        "SELECT COALESCE(category, ''), COUNT(*) FROM flagged_posts GROUP BY COALESCE(category, '')",
+        "CREATE TRIGGER IF NOT EXISTS trg_flagged_count_insert AFTER INSERT ON flagged_posts BEGIN "
+        "INSERT INTO category_counters(category, count) VALUES (COALESCE(NEW.category, ''), 1) "
+        "ON CONFLICT(category) DO UPDATE SET count = count + 1; END",
+        "CREATE TRIGGER IF NOT EXISTS trg_flagged_count_delete AFTER DELETE ON flagged_posts BEGIN "
+        "UPDATE category_counters SET count = count - 1 WHERE category = COALESCE(OLD.category, ''); END",
+    ],
+    [
+        # Cross-run dedup: posts already scanned (see storage.dedup). flagged_posts
+        # stays an append-only log of flag events, with no uniqueness constraint.
+        "CREATE TABLE IF NOT EXISTS seen_posts (post_key TEXT PRIMARY KEY, first_seen TEXT) WITHOUT ROWID",
+    ],
+    [
+        # Per-query scrape positions (see scrapers.cursor.CursorRun).
+        "CREATE TABLE IF NOT EXISTS scrape_cursors (platform TEXT, query TEXT, last_pos TEXT, pending_pos TEXT, "
+        "resume_pos TEXT, updated_at TEXT, PRIMARY KEY (platform, query))",
+    ],
+    [
+        # Perceptual hashes of known media (see media.phash.HashIndex); hashes are stored as signed 64-bit.
+        "CREATE TABLE IF NOT EXISTS media_hashes (kind TEXT, hash INTEGER, label TEXT, ref TEXT, confidence REAL, "
+        "added_at TEXT, PRIMARY KEY (kind, hash, label)) WITHOUT ROWID",
+    ],
+]
+
+COLUMNS = "id, platform, username, link, category, confidence, timestamp"
+
+INSERT_SQL = "INSERT INTO flagged_posts(platform, username, link, category, confidence, timestamp) VALUES (?,?,?,?,?,?)"
+
+
+def _row(record) -> tuple:
+    if isinstance(record, FlaggedRecord):
+        return record.as_row()
+    return (
+        record.get('platform'),
+        record.get('username'),
+        record.get('link'),
+        record.get('category'),
+        record.get('confidence'),
+        record.get('timestamp'),
+    )
+
+
+class _Lease:
+    """One thread's connection; held only in that thread's locals, so it is freed when the thread exits."""
+
+    __slots__ = ('conn', '__weakref__')
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+def _release(pool_lock, conns: List[sqlite3.Connection], conn: sqlite3.Connection):
+    with pool_lock:
+        if conn not in conns:
+            return  # already closed by Database.close()
+        conns.remove(conn)
+    conn.close()
+
 
 class Database:
-    def __init__(self, db_path='cybershield.db'):
+    """SQLite store for flagged posts.
+
+    Each thread gets one long-lived connection (WAL mode, so readers never
+    block the writer), closed again when that thread exits so short-lived
+    pipeline and fetch workers do not leave connections behind; writes are
+    serialized through a lock and committed once per batch.
+    """
+
+    def __init__(self, db_path='cybershield.db', cache_size_kb: int = 20000, synchronous: str = 'NORMAL'):
         self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._pool_lock = threading.RLock()
+        self._write_lock = threading.RLock()
         self._ensure()
 
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._pool_lock:
+            self._conns.append(conn)
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        lease = getattr(self._local, 'lease', None)
+        if lease is None:
+            if self.db_path == ':memory:' and self._conns:
+                lease = _Lease(self._conns[0])  # an in-memory DB only exists on its own connection
+            else:
+                lease = _Lease(self._open())
+                weakref.finalize(lease, _release, self._pool_lock, self._conns, lease.conn)
+            self._local.lease = lease
+        return lease.conn
+
     def _ensure(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write_lock, self._conn() as conn:
             conn.execute(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        with self._write_lock:
+            conn = self._conn()
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for n, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+                with conn:
+                    for stmt in statements:
+                        conn.execute(stmt)
+                    conn.execute(f"PRAGMA user_version={n}")
+
+    @staticmethod
+    def _where(platform: Optional[str] = None, category: Optional[str] = None, username: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None,
+               min_confidence: Optional[float] = None, before_id: Optional[int] = None,
+               after_id: Optional[int] = None) -> Tuple[str, list]:
+        clauses, params = [], []
+        for clause, value in (
+            ("platform = ?", platform),
+            ("category = ?", category),
+            ("username = ?", username),
+            ("timestamp >= ?", since),
+            ("timestamp < ?", until),
+            ("confidence >= ?", min_confidence),
+            ("id < ?", before_id),
+            ("id > ?", after_id),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
 
     def insert_flagged(self, record: Dict):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT INTO flagged_posts(platform, username, link, category, confidence, timestamp) VALUES (?,?,?,?,?,?)",
-                (
-                    record.get('platform'),
-                    record.get('username'),
-                    record.get('link'),
-                    record.get('category'),
-                    record.get('confidence'),
-                    record.get('timestamp'),
-                )
+        self.insert_many([record])
+
+    def insert_many(self, records: Iterable[Dict], seen_keys: Iterable[str] = ()) -> int:
+        """Insert a whole batch of records in one transaction; returns the number of new rows.
+
+        Accepts dicts, FlaggedRecord objects or a RecordBatch (whose rows are
+        read straight from its columns). ``seen_keys`` (see storage.dedup) are
+        recorded in the same transaction, so a post only counts as seen once
+        its flags are stored.
+        """
+        rows = list(records.rows()) if isinstance(records, RecordBatch) else [_row(r) for r in records]
+        keys = [k for k in seen_keys if k]
+        if not rows and not keys:
+            return 0
+        with METRICS.timer('stage_seconds', stage='db_write'), self._write_lock, self._conn() as conn:
+            inserted = conn.executemany(INSERT_SQL, rows).rowcount if rows else 0
+            if keys:
+                first_seen = datetime.utcnow().isoformat(timespec='seconds')
+                conn.executemany("INSERT OR IGNORE INTO seen_posts(post_key, first_seen) VALUES (?,?)",
+                                 [(k, first_seen) for k in keys])
+        METRICS.inc('db_rows_total', inserted)
+        return inserted
+
+    def iter_seen_keys(self, chunk_size: int = 10000) -> Iterator[str]:
+        cur = self._conn().execute("SELECT post_key FROM seen_posts")
+        try:
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for (key,) in rows:
+                    yield key
+        finally:
+            cur.close()
+
+    def existing_seen_keys(self, keys: List[str]) -> set:
+        found = set()
+        conn = self._conn()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cur = conn.execute(f"SELECT post_key FROM seen_posts WHERE post_key IN ({','.join('?' * len(chunk))})", chunk)
+            found.update(k for (k,) in cur.fetchall())
+        return found
+
+    def add_seen_keys(self, keys: List[str], first_seen: str) -> set:
+        """Record keys as seen in one transaction; returns the keys that were not already present."""
+        added = set()
+        with self._write_lock, self._conn() as conn:
+            for key in keys:
+                cur = conn.execute("INSERT OR IGNORE INTO seen_posts(post_key, first_seen) VALUES (?,?)", (key, first_seen))
+                if cur.rowcount == 1:
+                    added.add(key)
+        return added
+
+    def iter_media_hashes(self, kind: str, chunk_size: int = 10000) -> Iterator[Tuple[int, str, Optional[str], float]]:
+        """Yield (unsigned hash, label, ref, confidence) for every stored hash of ``kind``."""
+        cur = self._conn().execute("SELECT hash, label, ref, confidence FROM media_hashes WHERE kind = ?", (kind,))
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            for h, label, ref, confidence in rows:
+                yield h & 0xFFFFFFFFFFFFFFFF, label, ref, confidence
+
+    def add_media_hashes(self, kind: str, entries: Iterable[Tuple[int, str, Optional[str], float]]):
+        """Store (unsigned hash, label, ref, confidence) entries; existing (hash, label) pairs are kept."""
+        added_at = datetime.utcnow().isoformat(timespec='seconds')
+        rows = [(kind, h - (1 << 64) if h >= 1 << 63 else h, label, ref, confidence, added_at)
+                for h, label, ref, confidence in entries]
+        with self._write_lock, self._conn() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO media_hashes(kind, hash, label, ref, confidence, added_at) VALUES (?,?,?,?,?,?)",
+                rows,
             )
 
     def fetch_all(self) -> List[Dict]:
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.execute("SELECT id, platform, username, link, category, confidence, timestamp FROM flagged_posts ORDER BY id DESC")
-            cols = [c[0] for c in cur.description]
-            rows = cur.fetchall()
-        return [dict(zip(cols, r)) for r in rows]
\ No newline at end of file
+        cur = self._conn().execute(f"SELECT {COLUMNS} FROM flagged_posts ORDER BY id DESC")
+        cols = [c[0] for c in cur.description]
+        rows = cur.fetchall()
+        return [dict(zip(cols, r)) for r in rows]
+
+    def query(self, limit: int = 100, **filters) -> List[Dict]:
+        """Return one page of rows, newest first.
+
+        Filters: ``platform``, ``category``, ``username`` (every flag of one
+        account), ``since``/``until`` (ISO timestamps), ``min_confidence``.
+        Pass the last row's id as ``before_id`` to fetch the next page (keyset
+        pagination, so deep pages cost the same as the first).
+        """
+        where, params = self._where(**filters)
+        cur = self._conn().execute(f"SELECT {COLUMNS} FROM flagged_posts{where} ORDER BY id DESC LIMIT ?", params + [limit])
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    def iter_chunks(self, chunk_size: int = 1000, ascending: bool = False, **filters) -> Iterator[List[tuple]]:
+        """Stream matching rows as lists of ``COLUMNS`` tuples, ``chunk_size`` rows at a time."""
+        where, params = self._where(**filters)
+        order = "ASC" if ascending else "DESC"
+        cur = self._conn().execute(f"SELECT {COLUMNS} FROM flagged_posts{where} ORDER BY id {order}", params)
+        try:
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cur.close()
+
+    def iter_rows(self, chunk_size: int = 1000, ascending: bool = False, **filters) -> Iterator[Dict]:
+        """Stream matching rows as dicts through a cursor."""
+        cols = COLUMNS.split(', ')
+        for rows in self.iter_chunks(chunk_size, ascending, **filters):
+            for r in rows:
+                yield dict(zip(cols, r))
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        return self._conn().execute(f"SELECT COUNT(*) FROM flagged_posts{where}", params).fetchone()[0]
+
+    def category_counts(self, **filters) -> Dict[str, int]:
+        """Flag counts per category, largest first, computed in SQL."""
+        where, params = self._where(**filters)
+        cur = self._conn().execute(
+            f"SELECT category, COUNT(*) FROM flagged_posts{where} GROUP BY category ORDER BY COUNT(*) DESC", params
+        )
+        return dict(cur.fetchall())
+
+    def counters(self) -> Dict[str, int]:
+        """All-time flag counts per category from the insert-maintained counters."""
+        cur = self._conn().execute("SELECT category, count FROM category_counters WHERE count > 0 ORDER BY count DESC")
+        return dict(cur.fetchall())
+
+    def max_id(self) -> int:
+        return self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM flagged_posts").fetchone()[0]
+
+    def get_watermark(self, name: str) -> Tuple[int, Optional[str]]:
+        """Return ``(last_id, last_timestamp)`` recorded for report ``name``."""
+        row = self._conn().execute("SELECT last_id, last_timestamp FROM report_state WHERE name = ?", (name,)).fetchone()
+        return (row[0], row[1]) if row else (0, None)
+
+    def set_watermark(self, name: str, last_id: int, last_timestamp: Optional[str]):
+        with self._write_lock, self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO report_state(name, last_id, last_timestamp) VALUES (?,?,?)",
+                (name, last_id, last_timestamp),
+            )
+
+    def load_cursor(self, platform: str, query: str) -> Dict[str, Optional[str]]:
+        row = self._conn().execute(
+            "SELECT last_pos, pending_pos, resume_pos FROM scrape_cursors WHERE platform = ? AND query = ?",
+            (platform, query),
+        ).fetchone()
+        return dict(zip(('last', 'pending', 'resume'), row or (None, None, None)))
+
+    def save_cursor(self, platform: str, query: str, last: Optional[str], pending: Optional[str], resume: Optional[str]):
+        with self._write_lock, self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_cursors(platform, query, last_pos, pending_pos, resume_pos, updated_at) "
+                "VALUES (?,?,?,?,?,?)",
+                (platform, query, last, pending, resume, datetime.utcnow().isoformat(timespec='seconds')),
+            )
+
+    def close(self):
+        with self._pool_lock:
+            conns = list(self._conns)
+            self._conns.clear()
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
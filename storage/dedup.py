@@ -0,0 +1,119 @@
+import hashlib
+import math
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .database import Database
+
+
+_TWEET_ID = re.compile(r"/status/(\d+)")
+_SHORTCODE = re.compile(r"instagram\.com/(?:p|reel)/([^/?#]+)")
+
+
+def post_key(post: Dict) -> Optional[str]:
+    """Stable identity of a scraped post: platform plus tweet id / shortcode (or the link)."""
+    link = post.get('link') or ''
+    platform = post.get('platform') or ''
+    m = _TWEET_ID.search(link) or _SHORTCODE.search(link)
+    if m:
+        return f"{platform}:{m.group(1)}"
+    return f"{platform}:{link}" if link else None
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)."""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for p in self._positions(item):
+            self._bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class DedupIndex:
+    """Cross-run index of already-processed posts, backed by ``seen_posts``.
+
+    The SQLite unique key is the source of truth; an in-memory Bloom filter
+    in front of it lets brand-new posts skip the lookup. ``check`` only
+    reserves new posts in memory; they become seen once their flags are
+    persisted (``Database.insert_many(..., seen_keys=...)`` followed by
+    ``mark_seen``), so a post whose scan fails is classified again next
+    time. ``release`` drops reservations that were never persisted.
+    """
+
+    def __init__(self, db: Database, use_bloom: bool = True, bloom_capacity: int = 1_000_000):
+        self.db = db
+        self.bloom = BloomFilter(bloom_capacity) if use_bloom else None
+        self._lock = threading.Lock()
+        self._in_flight: set = set()
+        if self.bloom is not None:
+            for key in db.iter_seen_keys():
+                self.bloom.add(key)
+
+    def check(self, posts: Iterable[Dict]) -> List[bool]:
+        """True for each post not processed before and not reserved by another batch; reserves those."""
+        keys = [post_key(p) for p in posts]
+        with self._lock:
+            maybe = [k for k in keys if k and k not in self._in_flight and (self.bloom is None or k in self.bloom)]
+            known = self.db.existing_seen_keys(maybe) if maybe else set()
+            fresh = {k for k in keys if k and k not in known and k not in self._in_flight}
+            self._in_flight.update(fresh)
+        return self._first_copies(keys, fresh)
+
+    def mark_seen(self, keys: Iterable[str]):
+        """Call after ``keys`` were committed to ``seen_posts``."""
+        with self._lock:
+            for k in keys:
+                if k is None:
+                    continue
+                self._in_flight.discard(k)
+                if self.bloom is not None:
+                    self.bloom.add(k)
+
+    def release(self, keys: Iterable[str]):
+        """Drop reservations whose posts were never persisted, so a later scan classifies them."""
+        with self._lock:
+            self._in_flight.difference_update(keys)
+
+    def claim(self, posts: Iterable[Dict]) -> List[bool]:
+        """Check and mark posts as seen in one step, for callers that do not persist flags."""
+        keys = [post_key(p) for p in posts]
+        with self._lock:
+            maybe = [k for k in keys if k and (self.bloom is None or k in self.bloom)]
+            known = self.db.existing_seen_keys(maybe) if maybe else set()
+            fresh = self.db.add_seen_keys(
+                [k for k in dict.fromkeys(keys) if k and k not in known and k not in self._in_flight],
+                datetime.utcnow().isoformat(timespec='seconds'),
+            )
+            if self.bloom is not None:
+                for k in fresh:
+                    self.bloom.add(k)
+        return self._first_copies(keys, fresh)
+
+    @staticmethod
+    def _first_copies(keys: List[Optional[str]], fresh: set) -> List[bool]:
+        fresh = set(fresh)
+        result = []
+        for k in keys:
+            if k is None:
+                result.append(True)  # no identity; cannot dedup
+            elif k in fresh:
+                fresh.discard(k)  # later copies in the same batch are duplicates
+                result.append(True)
+            else:
+                result.append(False)
+        return result
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+from PIL import Image, ImageDraw, ImageFont
+
+from engine.metrics import METRICS
+
+from .records import FlaggedRecord, Post
+
+
+CARD_SIZE = (800, 300)
+EXTENSIONS = {'png': 'png', 'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def draw_card(record: FlaggedRecord, excerpt: str) -> Image.Image:
+    """Render one flagged record as a text summary card."""
+    w, h = CARD_SIZE
+    img = Image.new('RGB', (w, h), color=(20, 20, 20))
+    draw = ImageDraw.Draw(img)
+    try:
+        font = ImageFont.load_default()
+    except Exception:
+        font = None
+    lines = [
+        f"Platform: {record.get('platform')}",
+        f"User: {record.get('username')}",
+        f"Category: {record.get('category')} ({record.get('confidence'):.2f})",
+        f"Link: {record.get('link')}",
+        f"Excerpt: {(excerpt or '')[:120]}"
+    ]
+    y = 10
+    for line in lines:
+        draw.text((10, y), line, fill=(200, 200, 200), font=font)
+        y += 20
+    return img
+
+
+def save_image(img: Image.Image, path: str, fmt: str = 'png', compress_level: int = 6, quality: int = 80):
+    if fmt == 'png':
+        img.save(path, format='PNG', compress_level=compress_level)
+    elif fmt == 'webp':
+        img.save(path, format='WEBP', quality=quality, method=0)
+    else:
+        img.save(path, format='JPEG', quality=quality)
+
+
+def render_card(record: FlaggedRecord, excerpt: str, path: str, fmt: str = 'png',
+                compress_level: int = 6, quality: int = 80) -> str:
+    # Module-level so it can run in a process pool.
+    save_image(draw_card(record, excerpt), path, fmt, compress_level, quality)
+    return path
+
+
+def render_sheet(items: List[Tuple[FlaggedRecord, str]], path: str, columns: int = 2, fmt: str = 'png',
+                 compress_level: int = 6, quality: int = 80) -> str:
+    """Render several cards into one contact sheet image."""
+    w, h = CARD_SIZE
+    rows = (len(items) + columns - 1) // columns
+    sheet = Image.new('RGB', (w * min(columns, len(items)), h * rows), color=(0, 0, 0))
+    for n, (record, excerpt) in enumerate(items):
+        sheet.paste(draw_card(record, excerpt), ((n % columns) * w, (n // columns) * h))
+    save_image(sheet, path, fmt, compress_level, quality)
+    return path
+
+
+class EvidenceRenderer:
+    """Renders evidence cards off the scan thread.
+
+    Work goes to a thread or process pool; at most ``max_pending`` renders
+    are outstanding, after which ``submit`` blocks (bounded queue). With
+    ``sheet_size`` > 1 cards are buffered and rendered as contact sheets.
+    """
+
+    def __init__(self, screens_dir: str, executor: str = 'thread', workers: int = 2,
+                 max_pending: int = 64, fmt: str = 'png', compress_level: int = 1,
+                 quality: int = 80, sheet_size: int = 0, sheet_columns: int = 2):
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unsupported evidence format: {fmt}")
+        self.screens_dir = screens_dir
+        self.fmt = fmt
+        self.compress_level = compress_level
+        self.quality = quality
+        self.sheet_size = sheet_size
+        self.sheet_columns = sheet_columns
+        self._executor_kind = executor
+        self._workers = workers
+        self._pool: Optional[Executor] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending: List[Future] = []
+        self._sheet: List[Tuple[FlaggedRecord, str]] = []
+        self._lock = threading.Lock()
+        self._inflight = 0
+        os.makedirs(self.screens_dir, exist_ok=True)
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            cls = ProcessPoolExecutor if self._executor_kind == 'process' else ThreadPoolExecutor
+            self._pool = cls(max_workers=self._workers)
+        return self._pool
+
+    def _path(self, prefix: str) -> str:
+        fname = f"{prefix}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}.{EXTENSIONS[self.fmt]}"
+        return os.path.join(self.screens_dir, fname)
+
+    def _run(self, fn, *args) -> Future:
+        self._slots.acquire()  # backpressure once max_pending renders are queued
+        start = time.perf_counter()
+        try:
+            fut = self._executor().submit(fn, *args, fmt=self.fmt, compress_level=self.compress_level, quality=self.quality)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._inflight += 1
+            self._pending = [f for f in self._pending if not f.done()] + [fut]
+            METRICS.set('queue_depth', self._inflight, queue='evidence')
+        fut.add_done_callback(lambda _: self._done(start))
+        return fut
+
+    def _done(self, start: float):
+        self._slots.release()
+        # Time from submit to finished render, queueing included.
+        METRICS.observe('stage_seconds', time.perf_counter() - start, stage='render')
+        with self._lock:
+            self._inflight -= 1
+            METRICS.set('queue_depth', self._inflight, queue='evidence')
+
+    def submit(self, record: FlaggedRecord, post: Post) -> Optional[Future]:
+        """Queue a card for ``record``; returns its future (None while a sheet is filling).
+
+        The slotted record itself goes to the pool; it pickles as a plain tuple.
+        """
+        item = (record, (post.get('content') or '')[:120])
+        if self.sheet_size > 1:
+            with self._lock:
+                self._sheet.append(item)
+                if len(self._sheet) < self.sheet_size:
+                    return None
+                items, self._sheet = self._sheet, []
+            return self._run(render_sheet, items, self._path('sheet'), self.sheet_columns)
+        return self._run(render_card, item[0], item[1], self._path('shot'))
+
+    def flush(self):
+        """Render any partial sheet and wait for all queued work."""
+        with self._lock:
+            items, self._sheet = self._sheet, []
+        if items:
+            self._run(render_sheet, items, self._path('sheet'), self.sheet_columns)
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for fut in pending:
+            try:
+                fut.result()
+            except Exception:
+                pass  # Non-critical
+
+    def close(self):
+        self.flush()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
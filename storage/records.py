@@ -0,0 +1,219 @@
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+class _Record:
+    """Slotted record with the read-only mapping API the code used on dicts (``get``, ``[]``, ``keys``)."""
+
+    __slots__ = ()
+
+    def get(self, key: str, default=None):
+        if key in self.__slots__:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def keys(self):
+        return [k for k in self.__slots__ if getattr(self, k) is not None]
+
+    def to_dict(self) -> Dict:
+        return {k: getattr(self, k) for k in self.keys()}
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state):
+            setattr(self, k, v)
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and self.__getstate__() == other.__getstate__()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())})"
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Post(_Record):
+    """One scraped post."""
+
+    __slots__ = ('platform', 'username', 'content', 'link', 'media', 'post_id', 'posted_at', 'query')
+
+    def __init__(self, platform: str, username: Optional[str] = None, content: str = '', link: Optional[str] = None,
+                 media: Sequence[str] = (), post_id: Optional[str] = None, posted_at: Optional[str] = None,
+                 query: Optional[str] = None):
+        self.platform = _intern(platform)
+        self.username = username
+        self.content = content or ''
+        self.link = link
+        self.media = tuple(media) if media else ()
+        self.post_id = post_id
+        self.posted_at = posted_at
+        self.query = query
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> 'Post':
+        return cls(d.get('platform'), d.get('username'), d.get('content') or '', d.get('link'), d.get('media') or (),
+                   d.get('post_id'), d.get('posted_at'), d.get('query'))
+
+
+class FlaggedRecord(_Record):
+    """One classifier flag for a post, as stored in ``flagged_posts``."""
+
+    __slots__ = ('platform', 'username', 'link', 'category', 'confidence', 'timestamp')
+
+    def __init__(self, platform: str, username: Optional[str], link: Optional[str], category: str,
+                 confidence: float, timestamp: Optional[str] = None):
+        self.platform = _intern(platform)
+        self.username = username
+        self.link = link
+        self.category = _intern(category)
+        self.confidence = confidence
+        self.timestamp = timestamp
+
+    def as_row(self) -> tuple:
+        return (self.platform, self.username, self.link, self.category, self.confidence, self.timestamp)
+
+
+class StringColumn:
+    """Strings packed as UTF-8 into one bytearray with an offset index; None is kept in a mask."""
+
+    def __init__(self, values: Iterable[Optional[str]] = ()):
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+        self._null = bytearray()
+        for v in values:
+            self.append(v)
+
+    def append(self, value: Optional[str]):
+        if value is not None:
+            self._data += value.encode('utf-8')
+        self._offsets.append(len(self._data))
+        self._null.append(value is None)
+
+    def __len__(self) -> int:
+        return len(self._null)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self._null[i]:
+            return None
+        return self._data[self._offsets[i]:self._offsets[i + 1]].decode('utf-8')
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return (self[i] for i in range(len(self)))
+
+    def nbytes(self) -> int:
+        return len(self._data) + self._offsets.itemsize * len(self._offsets) + len(self._null)
+
+
+class CategoryColumn:
+    """Low-cardinality strings (platform, category) stored as codes into a value table."""
+
+    def __init__(self, values: Iterable[Optional[str]] = ()):
+        self._codes = array('H')
+        self._values: List[Optional[str]] = []
+        self._index: Dict[Optional[str], int] = {}
+        for v in values:
+            self.append(v)
+
+    def append(self, value: Optional[str]):
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self._values)
+            self._values.append(_intern(value))
+        self._codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        return self._values[self._codes[i]]
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        values = self._values
+        return (values[c] for c in self._codes)
+
+    def nbytes(self) -> int:
+        return self._codes.itemsize * len(self._codes)
+
+
+class _Batch:
+    """Columnar container: one column per field of ``record_type``."""
+
+    record_type = _Record
+    columns: Dict[str, type] = {}
+
+    def __init__(self, records: Iterable = ()):
+        self._cols = {name: kind() for name, kind in self.columns.items()}
+        self.extend(records)
+
+    def append(self, record):
+        get = record.get
+        for name, col in self._cols.items():
+            col.append(self._encode(name, get(name)))
+
+    def extend(self, records: Iterable):
+        for record in records:
+            self.append(record)
+
+    def _encode(self, name: str, value):
+        return value
+
+    def _decode(self, name: str, value):
+        return value
+
+    def __len__(self) -> int:
+        return len(next(iter(self._cols.values())))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return type(self)(self[j] for j in range(*i.indices(len(self))))
+        if i < 0:
+            i += len(self)
+        return self.record_type(**{name: self._decode(name, col[i]) for name, col in self._cols.items()})
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def nbytes(self) -> int:
+        return sum(col.nbytes() for col in self._cols.values())
+
+
+class RecordBatch(_Batch):
+    """Array-backed flagged records; ``rows()`` feeds ``Database.insert_many`` directly."""
+
+    record_type = FlaggedRecord
+    columns = {
+        'platform': CategoryColumn, 'username': StringColumn, 'link': StringColumn,
+        'category': CategoryColumn, 'confidence': lambda: array('d'), 'timestamp': StringColumn,
+    }
+
+    def _encode(self, name: str, value):
+        if name == 'confidence':
+            return float(value or 0.0)
+        return value
+
+    def rows(self) -> Iterator[tuple]:
+        cols = [self._cols[name] for name in ('platform', 'username', 'link', 'category', 'confidence', 'timestamp')]
+        return zip(*cols)
+
+    def nbytes(self) -> int:
+        return sum(col.itemsize * len(col) if isinstance(col, array) else col.nbytes() for col in self._cols.values())
+
@@ -1,88 +1,227 @@
+import csv
 import os
+import shutil
+import tempfile
+from collections import deque
 from datetime import datetime
-from typing import Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from .database import Database
+from .evidence import render_card
+from .records import FlaggedRecord, Post
+from engine.metrics import METRICS
+from engine.profiling import profiled
 import pandas as pd
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
-from PIL import Image, ImageDraw, ImageFont
+
+
+REPORT_COLUMNS = ['id','platform','username','link','category','confidence','timestamp']
+
+
+class _LazyStory:
+    """List-like story that pulls flowables from an iterator as the layout consumes them.
+
+    ``doc.build`` only looks at the head of its story (``len``, ``[0]``,
+    ``del [0]`` and re-inserting split parts at the front), so a table is
+    created from its DB chunk just before it is laid out and released
+    right after, instead of the whole story existing before the build.
+    """
+
+    def __init__(self, flowables: Iterable):
+        self._it = iter(flowables)
+        self._head: deque = deque()
+
+    def _fill(self, n: int) -> bool:
+        while len(self._head) < n:
+            try:
+                self._head.append(next(self._it))
+            except StopIteration:
+                return False
+        return True
+
+    def __len__(self) -> int:
+        self._fill(1)
+        return len(self._head)
+
+    def __bool__(self) -> bool:
+        return self._fill(1)
+
+    def __getitem__(self, i: int):
+        if not isinstance(i, int) or i < 0 or not self._fill(i + 1):
+            raise IndexError(i)
+        return self._head[i]
+
+    def __delitem__(self, i: int):
+        if i != 0 or not self._fill(1):
+            raise IndexError(i)
+        self._head.popleft()
+
+    def __setitem__(self, index, items):
+        if not (isinstance(index, slice) and index.start in (0, None) and index.stop == 0):
+            raise TypeError("only flowables[0:0] = parts is supported")
+        self._head.extendleft(reversed(list(items)))
+
+    def insert(self, i: int, item):
+        if i != 0:
+            raise IndexError(i)
+        self._head.appendleft(item)
 
 
 class ReportGenerator:
-    def __init__(self, db: Database, reports_dir: str = 'reports'):
+    def __init__(self, db: Database, reports_dir: str = 'reports', chunk_size: int = 1000,
+                 pdf_rows_per_table: int = 35):
         self.db = db
         self.reports_dir = reports_dir
+        self.chunk_size = chunk_size
+        self.pdf_rows_per_table = pdf_rows_per_table
         self.screens_dir = os.path.join(self.reports_dir, 'screenshots')
         os.makedirs(self.screens_dir, exist_ok=True)
 
-    def save_screenshot_placeholder(self, record, post):
-        # Creates a simple PNG with text summary.
+    def save_screenshot_placeholder(self, record: FlaggedRecord, post: Post):
+        # Creates a simple PNG with text summary (synchronously; see EvidenceRenderer for the async path).
         try:
-            w, h = 800, 300
-            img = Image.new('RGB', (w, h), color=(20, 20, 20))
-            draw = ImageDraw.Draw(img)
-            try:
-                font = ImageFont.load_default()
-            except Exception:
-                font = None
-            lines = [
-                f"Platform: {record.get('platform')}",
-                f"User: {record.get('username')}",
-                f"Category: {record.get('category')} ({record.get('confidence'):.2f})",
-                f"Link: {record.get('link')}",
-                f"Excerpt: {(post.get('content') or '')[:120]}"
-            ]
-            y = 10
-            for line in lines:
-                draw.text((10, y), line, fill=(200, 200, 200), font=font)
-                y += 20
             fname = f"shot_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}.png"
-            img.save(os.path.join(self.screens_dir, fname))
+            render_card(record, post.get('content') or '', os.path.join(self.screens_dir, fname))
         except Exception:
             pass  # Non-critical
 
-    def generate(self) -> Tuple[str, str]:
-        records = self.db.fetch_all()
+    @profiled('report')
+    @METRICS.timed('stage_seconds', stage='report', kind='full')
+    def generate(self, streaming: bool = True) -> Tuple[str, str]:
+        """Write CSV and PDF reports of all flagged posts.
+
+        Streaming mode writes the CSV chunk by chunk from a DB cursor, takes
+        summary counts from SQL and lays the PDF out as page-sized tables
+        that are built from their DB chunk only when the layout reaches them,
+        so rows and flowables held in memory stay bounded. The finished pages
+        themselves are kept (compressed) until the PDF is written, so that
+        part still grows with the table. ``streaming=False`` keeps the
+        original DataFrame path.
+        """
         ts = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         os.makedirs(self.reports_dir, exist_ok=True)
         csv_path = os.path.join(self.reports_dir, f'report_{ts}.csv')
         pdf_path = os.path.join(self.reports_dir, f'report_{ts}.pdf')
-        if records:
-            df = pd.DataFrame(records)
-        else:
-            df = pd.DataFrame(columns=['id','platform','username','link','category','confidence','timestamp'])
-        df.to_csv(csv_path, index=False)
-        self._generate_pdf(pdf_path, df)
+        if not streaming:
+            records = self.db.fetch_all()
+            if records:
+                df = pd.DataFrame(records)
+            else:
+                df = pd.DataFrame(columns=REPORT_COLUMNS)
+            df.to_csv(csv_path, index=False)
+            self._generate_pdf(pdf_path, df)
+            return csv_path, pdf_path
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_COLUMNS)
+            for chunk in self.db.iter_chunks(self.chunk_size):
+                writer.writerows(chunk)
+        self._generate_pdf_streaming(pdf_path)
         return csv_path, pdf_path
 
-    def _generate_pdf(self, pdf_path: str, df):
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4)
-        story = []
+    @profiled('report_incremental')
+    @METRICS.timed('stage_seconds', stage='report', kind='incremental')
+    def generate_incremental(self, name: str = 'rolling') -> Tuple[str, Optional[str]]:
+        """Process only rows added since the last incremental report called ``name``.
+
+        New rows are written to a temporary file and summarized in a delta
+        PDF; only once the PDF is built are they appended to ``<name>.csv``
+        and the watermark (last id and timestamp) advanced, so a failed run
+        leaves both untouched and the next run covers the same rows. Returns
+        the rolling CSV path and the delta PDF path (None when nothing is new).
+        """
+        os.makedirs(self.reports_dir, exist_ok=True)
+        csv_path = os.path.join(self.reports_dir, f'{name}.csv')
+        last_id, last_ts = self.db.get_watermark(name)
+        upto = self.db.max_id()  # fixed upper bound so concurrent inserts wait for the next run
+        if upto <= last_id:
+            return csv_path, None
+        bounds = {'after_id': last_id, 'before_id': upto + 1}
+        fd, delta_path = tempfile.mkstemp(prefix=f'.{name}_', suffix='.csv', dir=self.reports_dir)
+        try:
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                for chunk in self.db.iter_chunks(self.chunk_size, ascending=True, **bounds):
+                    writer.writerows(chunk)
+                    last_ts = chunk[-1][-1] or last_ts
+            ts = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+            pdf_path = os.path.join(self.reports_dir, f'{name}_delta_{ts}.pdf')
+            doc = SimpleDocTemplate(pdf_path, pagesize=A4, pageCompression=1)
+            story = self._summary_story(
+                self.db.count(**bounds), self.db.category_counts(**bounds),
+                title=f"CyberShield Delta Report (ids {last_id + 1}-{upto})", totals=self.db.counters(),
+            )
+            chunks = self.db.iter_chunks(self.pdf_rows_per_table, ascending=True, **bounds)
+            try:
+                doc.build(_LazyStory(self._stream_story(story, chunks)))
+            except Exception:
+                if os.path.exists(pdf_path):
+                    os.remove(pdf_path)
+                raise
+            new_file = not os.path.exists(csv_path)
+            with open(csv_path, 'a', newline='', encoding='utf-8') as out, \
+                    open(delta_path, newline='', encoding='utf-8') as delta:
+                if new_file:
+                    csv.writer(out).writerow(REPORT_COLUMNS)
+                shutil.copyfileobj(delta, out)
+            self.db.set_watermark(name, upto, last_ts)
+        finally:
+            os.remove(delta_path)
+        return csv_path, pdf_path
+
+    def _summary_story(self, total: int, cat_counts: Dict[str, int], title: str = "CyberShield Report",
+                       totals: Optional[Dict[str, int]] = None) -> List:
         styles = getSampleStyleSheet()
-        story.append(Paragraph("CyberShield Report", styles['Title']))
-        story.append(Spacer(1, 12))
+        story = [Paragraph(title, styles['Title']), Spacer(1, 12)]
         summary_stats = {
-            'Total Flagged': int(df.shape[0]),
+            'Total Flagged': total,
         }
-        cat_counts = df['category'].value_counts().to_dict() if not df.empty else {}
         for k,v in cat_counts.items():
             summary_stats[f"{k} Count"] = v
+        for k,v in (totals or {}).items():
+            summary_stats[f"{k or 'uncategorized'} All-time"] = v
         for k,v in summary_stats.items():
             story.append(Paragraph(f"{k}: {v}", styles['Normal']))
         story.append(Spacer(1, 12))
+        return story
+
+    @staticmethod
+    def _table(data: List[list]) -> Table:
+        table = Table(data, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.darkblue),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ('GRID', (0,0), (-1,-1), 0.25, colors.grey),
+            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.lightgrey])
+        ]))
+        return table
+
+    def _stream_story(self, head: List, chunks: Iterable[List[tuple]]) -> Iterator:
+        """``head``, then one table per DB chunk, created as the layout asks for it."""
+        yield from head
+        has_rows = False
+        # Page-sized tables never need splitting, so layout cost stays linear.
+        for chunk in chunks:
+            has_rows = True
+            yield self._table([REPORT_COLUMNS] + [list(r) for r in chunk])
+        if not has_rows:
+            yield Paragraph("No flagged records.", getSampleStyleSheet()['Italic'])
+
+    def _generate_pdf_streaming(self, pdf_path: str):
+        doc = SimpleDocTemplate(pdf_path, pagesize=A4, pageCompression=1)
+        story = self._summary_story(self.db.count(), self.db.category_counts())
+        doc.build(_LazyStory(self._stream_story(story, self.db.iter_chunks(self.pdf_rows_per_table))))
+
+    def _generate_pdf(self, pdf_path: str, df):
+        doc = SimpleDocTemplate(pdf_path, pagesize=A4)
+        cat_counts = df['category'].value_counts().to_dict() if not df.empty else {}
+        story = self._summary_story(int(df.shape[0]), cat_counts)
         if not df.empty:
             data = [list(df.columns)] + df.values.tolist()
-            table = Table(data, repeatRows=1)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.darkblue),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-                ('GRID', (0,0), (-1,-1), 0.25, colors.grey),
-                ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.lightgrey])
-            ]))
-            story.append(table)
+            story.append(self._table(data))
         else:
-            story.append(Paragraph("No flagged records.", styles['Italic']))
-        doc.build(story)
\ No newline at end of file
+            story.append(Paragraph("No flagged records.", getSampleStyleSheet()['Italic']))
+        doc.build(story)
@@ -0,0 +1,35 @@
+from classifiers.cascade import Cascade
+
+LONG = "a long enough english sentence about the news"
+
+
+def test_route_stages():
+    cascade = Cascade(min_length=20)
+    texts = [LONG, LONG, "short", "это длинное предложение на русском языке", LONG]
+    send = cascade.route('fake_news', texts, [True, False, False, False, False])
+    assert send == [False, True, False, False, True]
+    stats = cascade.stats()['fake_news']
+    assert stats['seen'] == 5
+    assert (stats['keyword_exit'], stats['to_model'], stats['too_short'], stats['non_english']) == (1, 2, 1, 1)
+    assert stats['model_rate'] == 0.4
+
+
+def test_route_without_keyword_exit():
+    cascade = Cascade(keyword_exit=False, require_keyword=True)
+    assert cascade.route('bullying', [LONG, LONG], [True, False]) == [True, False]
+    assert cascade.stats()['bullying']['no_keyword'] == 1
+
+
+def test_model_min_length():
+    cascade = Cascade(min_length=5)
+    assert cascade.route('fake_news', ["just twelve!"], [False]) == [True]
+    assert cascade.route('fake_news', ["just twelve!"], [False], model_min_length=20) == [False]
+
+
+def test_short_circuit_and_cached_counts():
+    cascade = Cascade(short_circuit=0.9)
+    assert cascade.is_final('fake_news', 0.95)
+    assert not cascade.is_final('fake_news', 0.5)
+    cascade.count_cached('fake_news', 3)
+    stats = cascade.stats()['fake_news']
+    assert (stats['short_circuit'], stats['cached'], stats['seen']) == (1, 3, 3)
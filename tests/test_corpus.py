@@ -0,0 +1,65 @@
+import os
+import pickle
+
+import pytest
+
+from storage.corpus import Corpus, CorpusWriter, convert_csv, corpus_path, open_backup
+from storage.records import Post
+
+POSTS = [
+    Post('twitter', 'alice', 'first post', 'https://twitter.com/alice/status/1', post_id='1', query='q'),
+    Post('instagram', None, 'ünïcödé ✓', None, media=['https://a/1.jpg', 'https://a/2.jpg'],
+         posted_at='2024-01-01T00:00:00'),
+    Post('twitter', 'bob', '', 'https://twitter.com/bob/status/3'),
+]
+
+
+def fields(post):
+    return {k: post.get(k) for k in Post.__slots__}
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'posts.corpus')
+    with CorpusWriter(path) as writer:
+        writer.extend(POSTS * 10)
+    return path
+
+
+def test_round_trip(path):
+    with Corpus(path) as corpus:
+        assert len(corpus) == 30
+        assert [fields(p) for p in corpus] == [fields(p) for p in POSTS * 10]
+        assert fields(corpus[-2]) == fields(POSTS[1])
+
+
+def test_slices_and_shards(path):
+    with Corpus(path) as corpus:
+        parts = [corpus.shard(i, 4) for i in range(4)]
+        assert [len(p) for p in parts] == [7, 8, 7, 8]
+        assert [fields(p) for part in parts for p in part] == [fields(p) for p in corpus]
+        view = corpus[3:6]
+        assert [fields(p) for p in view] == [fields(p) for p in POSTS]
+        assert [fields(p) for p in pickle.loads(pickle.dumps(view))] == [fields(p) for p in POSTS]
+        for part in parts + [view]:
+            part.close()
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = str(tmp_path / 'broken.corpus')
+    with pytest.raises(RuntimeError):
+        with CorpusWriter(path) as writer:
+            writer.append(POSTS[0])
+            raise RuntimeError
+    assert os.listdir(tmp_path) == []
+
+
+def test_convert_csv_and_open_backup(tmp_path):
+    csv_path = tmp_path / 'twitter_backup.csv'
+    csv_path.write_text("username,content,link\ncarol,hello,https://twitter.com/carol/status/9\n", encoding='utf-8')
+    assert open_backup(str(csv_path)) is None
+    assert convert_csv(str(csv_path), platform='twitter') == 1
+    with open_backup(str(csv_path)) as corpus:
+        assert [(p.platform, p.username, p.content) for p in corpus] == [('twitter', 'carol', 'hello')]
+    os.utime(corpus_path(str(csv_path)), (0, 0))  # older than the CSV: stale
+    assert open_backup(str(csv_path)) is None
@@ -0,0 +1,88 @@
+import pytest
+
+from scrapers.cursor import CursorRun
+from storage.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'test.db'))
+    yield db
+    db.close()
+
+
+def poll(db, feed, limit, resume=False, persist=True):
+    """Fetch like the twitter scraper does over ``feed`` (ids newest first); returns the fetched ids."""
+    run = CursorRun(db, 'twitter', 'q', int, resume)
+    fetched = []
+    complete = False
+    for pos in map(str, feed):
+        if run.seen(pos):
+            complete = True
+            break
+        if run.skip(pos):
+            continue
+        if len(fetched) >= limit:
+            break
+        fetched.append(pos)
+        run.fetched(pos)
+    else:
+        complete = True
+    run.finish(complete)
+    if persist:
+        for pos in fetched:
+            run.persisted(pos)
+        run.checkpoint()
+    return [int(p) for p in fetched]
+
+
+def state(db):
+    return db.load_cursor('twitter', 'q')
+
+
+def test_complete_scan_stops_at_last(db):
+    assert poll(db, range(5, 0, -1), limit=10) == [5, 4, 3, 2, 1]
+    assert state(db) == {'last': '5', 'pending': None, 'resume': None}
+    assert poll(db, range(7, 0, -1), limit=10) == [7, 6]
+    assert state(db) == {'last': '7', 'pending': None, 'resume': None}
+
+
+def test_limit_hit_moves_forward_and_leaves_gap(db):
+    assert poll(db, range(100, 0, -1), limit=10) == list(range(100, 90, -1))
+    assert state(db) == {'last': None, 'pending': '100', 'resume': '91'}
+    # Nothing new: the plain poll stops at the pending position instead of refetching.
+    assert poll(db, range(100, 0, -1), limit=10) == []
+    assert state(db) == {'last': None, 'pending': '100', 'resume': '91'}
+    assert poll(db, range(105, 0, -1), limit=10) == [105, 104, 103, 102, 101]
+    assert state(db) == {'last': None, 'pending': '105', 'resume': '91'}
+
+
+def test_resume_fills_gap(db):
+    poll(db, range(30, 0, -1), limit=10)
+    assert state(db) == {'last': None, 'pending': '30', 'resume': '21'}
+    assert poll(db, range(30, 0, -1), limit=10, resume=True) == list(range(20, 10, -1))
+    assert state(db) == {'last': None, 'pending': '30', 'resume': '11'}
+    assert poll(db, range(30, 0, -1), limit=10, resume=True) == list(range(10, 0, -1))
+    assert state(db) == {'last': '30', 'pending': None, 'resume': None}
+    assert poll(db, range(32, 0, -1), limit=10) == [32, 31]
+
+
+def test_unpersisted_posts_keep_cursor(db):
+    poll(db, range(5, 0, -1), limit=10)
+    assert poll(db, range(9, 0, -1), limit=10, persist=False) == [9, 8, 7, 6]
+    assert state(db) == {'last': '5', 'pending': None, 'resume': None}
+    assert poll(db, range(9, 0, -1), limit=10) == [9, 8, 7, 6]
+
+
+def test_cursor_waits_for_newer_posts(db):
+    run = CursorRun(db, 'twitter', 'q', int)
+    for pos in ('3', '2', '1'):
+        run.fetched(pos)
+    run.finish(True)
+    run.persisted('2')
+    run.persisted('1')
+    run.checkpoint()
+    assert state(db) == {'last': None, 'pending': None, 'resume': None}
+    run.persisted('3')
+    run.checkpoint()
+    assert state(db) == {'last': '3', 'pending': None, 'resume': None}
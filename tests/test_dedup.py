@@ -0,0 +1,52 @@
+import pytest
+
+from storage.database import Database
+from storage.dedup import DedupIndex, post_key
+
+
+def post(n):
+    return {'platform': 'twitter', 'link': f"https://twitter.com/u/status/{n}"}
+
+
+@pytest.fixture(params=[True, False], ids=['bloom', 'no-bloom'])
+def db_index(request, tmp_path):
+    db = Database(str(tmp_path / 'test.db'))
+    yield db, DedupIndex(db, use_bloom=request.param)
+    db.close()
+
+
+def test_post_key():
+    assert post_key(post(42)) == 'twitter:42'
+    assert post_key({'platform': 'instagram', 'link': 'https://www.instagram.com/p/AbC_1/'}) == 'instagram:AbC_1'
+    assert post_key({'platform': 'twitter', 'link': ''}) is None
+
+
+def test_check_reserves_and_skips_duplicates(db_index):
+    _, index = db_index
+    assert index.check([post(1), post(2), post(1), {'platform': 'twitter'}]) == [True, True, False, True]
+    assert index.check([post(1), post(3)]) == [False, True]  # 1 is still reserved
+
+
+def test_release_allows_rescan(db_index):
+    _, index = db_index
+    assert index.check([post(1)]) == [True]
+    index.release(['twitter:1'])
+    assert index.check([post(1)]) == [True]
+
+
+def test_mark_seen_after_persist(db_index, tmp_path):
+    db, index = db_index
+    assert index.check([post(1), post(2)]) == [True, True]
+    db.insert_many([], seen_keys=['twitter:1'])
+    index.mark_seen(['twitter:1'])
+    index.release(['twitter:2'])
+    assert index.check([post(1), post(2)]) == [False, True]
+    # A new index (a later run) finds the persisted key in the database.
+    assert DedupIndex(db, use_bloom=index.bloom is not None).check([post(1), post(3)]) == [False, True]
+
+
+def test_claim_marks_seen(db_index):
+    db, index = db_index
+    assert index.claim([post(1), post(1)]) == [True, False]
+    assert db.existing_seen_keys(['twitter:1']) == {'twitter:1'}
+    assert index.check([post(1)]) == [False]
@@ -0,0 +1,35 @@
+import json
+import os
+
+from classifiers.keywords import KeywordMatcher
+
+
+def test_match_categories():
+    matcher = KeywordMatcher()
+    assert matcher.match("Total HOAX, you idiot") == {'fake_news': {'hoax'}, 'bullying_or_hate': {'idiot'}}
+    assert matcher.match("nothing to see") == {}
+    assert matcher.match(None) == {}
+
+
+def test_overlapping_terms():
+    matcher = KeywordMatcher({'a': ['he', 'she', 'hers'], 'b': ['his', 'e']})
+    assert matcher.match("ushers") == {'a': {'he', 'she', 'hers'}, 'b': {'e'}}
+    assert matcher.match_batch(["his", "x"]) == [{'b': {'his'}}, {}]
+
+
+def test_terms_are_normalised():
+    matcher = KeywordMatcher({'a': [' Anti India ', '']})
+    assert matcher.terms('a') == {'anti india'}
+    assert matcher.match("ANTI INDIA rally") == {'a': {'anti india'}}
+
+
+def test_reload_from_file(tmp_path):
+    path = tmp_path / 'keywords.json'
+    path.write_text(json.dumps({'a': ['foo']}))
+    matcher = KeywordMatcher(path=str(path), check_interval=0)
+    before = matcher.fingerprint
+    assert matcher.match("foo bar") == {'a': {'foo'}}
+    path.write_text(json.dumps({'a': ['bar']}))
+    os.utime(path, (0, 0))
+    assert matcher.match_batch(["foo bar"]) == [{'a': {'bar'}}]
+    assert matcher.fingerprint != before
@@ -0,0 +1,43 @@
+import random
+
+from media.phash import HashIndex, hamming
+
+
+def flip(h, bits):
+    for b in bits:
+        h ^= 1 << b
+    return h
+
+
+def test_lookup_nearest_first():
+    index = HashIndex(max_distance=8)
+    base = 0x0123456789ABCDEF
+    index.add(base, 'deepfake', 'a')
+    index.add(flip(base, [0, 9, 20]), 'deepfake', 'b')
+    index.add(flip(base, range(0, 40, 4)), 'deepfake', 'c')  # 10 bits away
+    matches = index.lookup(base)
+    assert [(m.distance, m.ref) for m in matches] == [(0, 'a'), (3, 'b')]
+    assert index.nearest(flip(base, [63])).ref == 'a'
+    assert index.lookup(base, max_distance=10)[-1].ref == 'c'
+
+
+def test_lookup_by_label():
+    index = HashIndex()
+    index.add(42, 'deepfake')
+    index.add(42, 'meme')
+    index.add(42, 'meme')  # duplicates are ignored
+    assert len(index) == 2
+    assert [m.label for m in index.lookup(42, label='meme')] == ['meme']
+
+
+def test_lookup_matches_brute_force():
+    rng = random.Random(7)
+    index = HashIndex(max_distance=8)
+    hashes = [rng.getrandbits(64) for _ in range(300)]
+    # Near copies so every query has real neighbours.
+    hashes += [flip(h, rng.sample(range(64), rng.randint(1, 12))) for h in hashes[:100]]
+    for i, h in enumerate(hashes):
+        index.add(h, 'deepfake', str(i))
+    for q in hashes[:100]:
+        expected = sorted(hamming(q, h) for h in set(hashes) if hamming(q, h) <= 8)
+        assert [m.distance for m in index.lookup(q)] == expected